@@ -0,0 +1,94 @@
+import argparse
+import importlib
+import inspect
+import sys
+
+import pandas as pd
+
+
+def parse_filters(pairs):
+    # column=value, or column=a,b for several members
+    filters = {}
+    for pair in pairs:
+        column, _, value = pair.partition("=")
+        if not value:
+            raise ValueError(f"Filter {pair!r} is not column=value")
+        members = value.split(",")
+        filters[column] = members if len(members) > 1 else members[0]
+    return filters
+
+
+def computations(module):
+    # The functions of a page module that run from a filter spec; the others take frames computed by the page
+    return sorted(name for name, function in inspect.getmembers(module, inspect.isfunction)
+                  if function.__module__ == module.__name__ and not name.startswith("_") and
+                  "spec" in inspect.signature(function).parameters)
+
+
+def call(name, spec, options):
+    # page.function, called with the spec plus any extra keyword options
+    page, _, function = name.partition(".")
+    module = importlib.import_module(f"analytics.{page}")
+    computation = getattr(module, function)
+    signature = inspect.signature(computation)
+    try:
+        if "spec" not in signature.parameters:
+            raise TypeError("it does not take a filter spec")
+        signature.bind(spec=spec, **options)
+    except TypeError as e:
+        raise ValueError(f"{name}{signature} cannot be run with these options ({e}); computations of {page}: "
+                         f"{', '.join(computations(module))}")
+    return computation(spec=spec, **options)
+
+
+def write(result, output_format):
+    if isinstance(result, dict):
+        result = pd.Series(result, dtype=object)
+    if not isinstance(result, (pd.Series, pd.DataFrame)):
+        print(result)
+    elif output_format == "csv":
+        result.to_csv(sys.stdout)
+    elif output_format == "json":
+        print(result.to_json(date_format="iso", indent=1))
+    else:
+        print(result.to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m analytics",
+                                     description="Run one dashboard computation without the UI, "
+                                                 "e.g. sales_overview.location_sales.")
+    parser.add_argument("computation", help="page.function, e.g. home.monthly_sales")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--filter", action="append", default=[], metavar="COLUMN=VALUE",
+                        help="Dimension filter, repeatable; COLUMN=a,b selects several members")
+    parser.add_argument("--option", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra keyword argument of the function, repeatable, e.g. n=10")
+    parser.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    args = parser.parse_args()
+
+    try:
+        spec = parse_filters(args.filter)
+        options = {}
+        for pair in args.option:
+            name, _, value = pair.partition("=")
+            options[name] = int(value) if value.lstrip("-").isdigit() else value
+    except ValueError as e:
+        parser.error(str(e))
+    if args.start_date:
+        spec["start_date"] = args.start_date
+    if args.end_date:
+        spec["end_date"] = args.end_date
+
+    try:
+        result = call(args.computation, spec, options)
+    except (ImportError, AttributeError):
+        parser.error(f"Unknown computation {args.computation!r}")
+    except ValueError as e:
+        parser.error(str(e))
+    write(result, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import query
+import sketches
+from data_loader import load_derived
+from query import count_distinct, rollup, top_k, totals
+from transactions import estimated, transaction_count
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Filter states whose results are kept by memoized(), per computation
+MEMO_ENTRIES = 64
+
+_memo_lock = threading.Lock()
+_memos = {}
+
+# A filter spec is a dict of start_date, end_date and dimension filters (a member or a list of members),
+# e.g. {'start_date': '2023-01-01', 'end_date': '2023-03-31', 'product_category': ['Coffee', 'Tea']}
+
+
+def sales_kpis(spec):
+    # Headline metrics of a selection; the average transaction value is per sales row, as on every page
+    selection_totals = totals(**spec)
+    total_sales = selection_totals['total_sales']
+    return {
+        'total_sales': total_sales,
+        'total_transactions': transaction_count(**spec),
+        # Relative standard error of total_transactions, 0 when it is an exact count
+        'transactions_error': sketches.RELATIVE_ERROR if estimated(**spec) else 0.0,
+        'avg_transaction_value': total_sales / selection_totals['row_count'] if selection_totals['row_count']
+        else float('nan'),
+        'unique_products': count_distinct('product_id', **spec),
+        'unique_locations': len(rollup('store_location', **spec)),
+    }
+
+
+def memoized(name, compute, spec):
+    # compute(spec) once per filter state and query backend. The memo is a derived result of the dataset, so it
+    # is dropped as soon as the data changes; results are shared between sessions and must not be modified.
+    if data_loader.OUT_OF_CORE:
+        # The dataset is never loaded out of core, so the memo lives as long as the CSV is unchanged
+        version = data_loader.fingerprint(data_loader.DATA_PATH)
+        with _memo_lock:
+            if _memos.get(name, (None,))[0] != version:
+                _memos[name] = (version, OrderedDict())
+            memo = _memos[name][1]
+    else:
+        memo = load_derived(f"memo:{name}", lambda data: OrderedDict(), ['transaction_date'])
+    key = repr((query.BACKEND, sorted(spec.items())))
+    with _memo_lock:
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+    result = compute(spec)
+    with _memo_lock:
+        memo[key] = result
+        while len(memo) > MEMO_ENTRIES:
+            memo.popitem(last=False)
+    return result
+
+
+def histogram(values, bins=20):
+    # Bin edges and counts of a distribution, so charts get one row per bin instead of the raw values.
+    # Integers spanning fewer values than bins get one bin per value.
+    values = np.asarray(values)
+    values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+    if values.dtype.kind in 'iu' and len(values) and values.max() - values.min() < bins:
+        bins = np.arange(values.min(), values.max() + 2) - 0.5
+    counts, edges = np.histogram(values, bins)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+
+def measure_by(by, measure, spec):
+    # One measure summed by one or more dimensions (or derived date keys)
+    return rollup(by, **spec)[measure]
+
+
+def weekday_sales(spec):
+    return measure_by('day_of_week', 'total_sales', spec).reindex(WEEKDAYS)
+
+
+def top_products(spec, n=5, measure='transaction_qty'):
+    return top_k('product_detail', measure, n, **spec)
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from analytics.common import histogram, measure_by, memoized, weekday_sales
+from data_loader import SLOT_MINUTES, load_rows
+from transactions import covers, filter_transactions
+
+# Transaction value segments
+SEGMENT_BINS = [0, 20, 100, 200, float('inf')]
+SEGMENT_LABELS = ['Low Value', 'Moderate Value', 'High Value', 'Very High Value']
+
+
+def hourly_sales(spec):
+    return measure_by('transaction_hour', 'total_sales', spec)
+
+
+def sales_by_weekday(spec):
+    return weekday_sales(spec)
+
+
+def staffing_curve(spec):
+    # Average distinct transactions per time slot per trading day, indexed by the slot's "HH:MM" start
+    if covers(spec):
+        table = filter_transactions(**spec)
+        trading_days = max(table['transaction_date'].nunique(), 1)
+        slot_transactions = table.groupby('time_slot').size() / trading_days
+    else:
+        rows = load_rows(['transaction_date', 'time_slot', 'transaction_id'], **spec)
+        trading_days = max(rows['transaction_date'].nunique(), 1)
+        slot_transactions = rows.groupby('time_slot')['transaction_id'].nunique() / trading_days
+    slot_transactions.index = [f"{slot * SLOT_MINUTES // 60:02d}:{slot * SLOT_MINUTES % 60:02d}"
+                               for slot in slot_transactions.index]
+    return slot_transactions
+
+
+def transaction_totals(spec):
+    # Units and sales per transaction, from the transaction table unless product filters need the sales rows
+    if covers(spec):
+        return filter_transactions(**spec).set_index('transaction_id')[['transaction_qty', 'total_sales']]
+    rows = load_rows(['transaction_id', 'transaction_qty', 'total_sales'], **spec)
+    return rows.groupby('transaction_id')[['transaction_qty', 'total_sales']].sum()
+
+
+def basket_size_histogram(spec, bins=20):
+    # Binned items per transaction, memoized per filter state
+    return memoized(f'basket_size_histogram:{bins}',
+                    lambda spec: histogram(transaction_totals(spec)['transaction_qty'], bins), spec)
+
+
+def transaction_value_histogram(spec, bins=20):
+    # Binned sales per transaction, memoized per filter state
+    return memoized(f'transaction_value_histogram:{bins}',
+                    lambda spec: histogram(transaction_totals(spec)['total_sales'], bins), spec)
+
+
+def segments(transactions):
+    # Transaction count and average value per value segment, from transaction_totals()
+    segment = pd.cut(transactions['total_sales'], bins=SEGMENT_BINS, labels=SEGMENT_LABELS)
+    grouped = transactions['total_sales'].groupby(segment, observed=False)
+    return pd.DataFrame({'transactions': grouped.size(), 'avg_value': grouped.mean()}).reindex(SEGMENT_LABELS)
@@ -0,0 +1,23 @@
+from analytics.common import top_products
+from data_loader import load_rows
+import sketches
+from transactions import covers, estimated, filter_transactions
+
+
+def popular_products(spec, n=10):
+    return top_products(spec, n).reset_index()
+
+
+def monthly_transactions(spec):
+    # Distinct transactions per month, months as "YYYY-MM" strings
+    if covers(spec):
+        table = filter_transactions(**spec)
+        year_month = table['transaction_date'].dt.to_period('M').astype(str).rename('year_month')
+        return table.groupby(year_month).size().rename('transaction_id').reset_index()
+    if estimated(**spec):
+        monthly = sketches.distinct_transactions(by='year_month', **spec).rename('transaction_id')
+        monthly.index = monthly.index.astype(str)
+        return monthly.reset_index()
+    rows = load_rows(['transaction_date', 'transaction_id'], **spec)
+    year_month = rows['transaction_date'].dt.to_period('M').astype(str).rename('year_month')
+    return rows.groupby(year_month)['transaction_id'].nunique().reset_index()
@@ -0,0 +1,55 @@
+import pandas as pd
+
+import forecast_engine
+from analytics.common import measure_by, memoized
+from batch_forecast import lookup
+from forecast_cache import arima_forecast
+
+ARIMA_ORDER = (5, 1, 0)
+
+
+def daily_sales(spec):
+    return measure_by('transaction_date', 'total_sales', spec).reset_index()
+
+
+def sales_summary(sales):
+    # Totals of daily_sales()
+    return {
+        'total_sales': sales['total_sales'].sum(),
+        'avg_daily_sales': sales['total_sales'].mean(),
+        'last_sales_date': sales['transaction_date'].max(),
+    }
+
+
+def sales_forecast(sales, steps=30):
+    # ARIMA forecast of daily_sales(); the fit is cached until the series changes
+    forecast = arima_forecast(sales.set_index('transaction_date')['total_sales'], order=ARIMA_ORDER, steps=steps)
+    return pd.DataFrame({'transaction_date': forecast.index, 'forecast_sales': forecast.to_numpy()})
+
+
+def product_demand(product, spec=None):
+    return measure_by('transaction_date', 'transaction_qty', dict(spec or {}, product_detail=product)).reset_index()
+
+
+def product_forecasts(method, steps=30):
+    # Every product's forecast by a vectorized method, computed once per dataset version
+    return memoized(f'product_forecasts:{method}:{steps}',
+                    lambda spec: forecast_engine.forecast(method, ['product_detail'], steps=steps), {})
+
+
+def product_forecast(product, demand, method='ARIMA (5,1,0)', steps=30):
+    # Demand forecast for one product from product_demand(). ARIMA comes from the batch job's results when they
+    # cover this exact series, otherwise it is fitted on demand; vectorized methods forecast every product at once.
+    if method == 'ARIMA (5,1,0)':
+        series = demand.set_index('transaction_date')['transaction_qty']
+        forecast = lookup(series, order=ARIMA_ORDER, steps=steps, product_detail=product)
+        if forecast is None:
+            forecast = arima_forecast(series, order=ARIMA_ORDER, steps=steps)
+    else:
+        forecast = product_forecasts(method, steps).loc[product]
+    return pd.DataFrame({'transaction_date': forecast.index, 'forecast_demand': forecast.to_numpy()})
+
+
+def peak_days(forecast, quantile=0.9):
+    # Forecast days above the given quantile of sales_forecast()
+    return forecast[forecast['forecast_sales'] > forecast['forecast_sales'].quantile(quantile)]
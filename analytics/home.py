@@ -0,0 +1,27 @@
+from analytics.common import measure_by, sales_kpis, top_products
+
+
+def kpis(spec):
+    return sales_kpis(spec)
+
+
+def monthly_sales(spec):
+    monthly = measure_by('year_month', 'total_sales', spec).reset_index()
+    monthly['transaction_date'] = monthly['year_month'].dt.to_timestamp()  # Period to timestamp for plotting
+    return monthly
+
+
+def product_sales(spec):
+    return measure_by('product_detail', 'total_sales', spec).reset_index()
+
+
+def hourly_sales(spec):
+    return measure_by('transaction_hour', 'total_sales', spec).reset_index()
+
+
+def product_type_sales(spec):
+    return measure_by('product_type', 'total_sales', spec).reset_index()
+
+
+def top_products_by_quantity(spec, n=5):
+    return top_products(spec, n).reset_index()
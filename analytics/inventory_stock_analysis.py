@@ -0,0 +1,37 @@
+from analytics.common import measure_by
+from data_loader import load_rows
+from query import count_distinct
+
+# Months averaged by the demand forecast
+FORECAST_MONTHS = 3
+
+
+def monthly_demand(spec):
+    # Units per month with a trailing moving-average forecast, months as "YYYY-MM" strings
+    demand = measure_by('year_month', 'transaction_qty', spec).reset_index()
+    demand['year_month'] = demand['year_month'].astype(str)
+    demand['demand_forecast'] = demand['transaction_qty'].rolling(window=FORECAST_MONTHS).mean()
+    return demand
+
+
+def seasonal_demand(spec):
+    return measure_by('month', 'transaction_qty', spec).reset_index()
+
+
+def turnover_by_type(spec):
+    # Units per transaction for each product type, highest first
+    rows = load_rows(['transaction_id', 'transaction_qty', 'product_type'], **spec)
+    turnover = rows.groupby('product_type', observed=True).agg({'transaction_qty': 'sum', 'transaction_id': 'nunique'})
+    turnover['turnover_rate'] = turnover['transaction_qty'] / turnover['transaction_id']
+    return turnover.sort_values(by='turnover_rate', ascending=False)
+
+
+def summary(spec):
+    demand = measure_by('year_month', 'transaction_qty', spec)
+    # Counted exactly rather than estimated from the sketches, like the per-type rates of turnover_by_type()
+    transactions = count_distinct('transaction_id', **spec)
+    return {
+        'total_demand': demand.sum(),
+        'monthly_demand_avg': demand.mean(),
+        'turnover_rate': demand.sum() / transactions,  # Simplified turnover: units per transaction
+    }
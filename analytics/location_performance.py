@@ -0,0 +1,28 @@
+from analytics.common import WEEKDAYS, measure_by, memoized, sales_kpis, weekday_sales
+from query import rollup
+
+
+def kpis(spec):
+    return sales_kpis(spec)
+
+
+def sales_by_weekday(spec):
+    return weekday_sales(spec)
+
+
+def hourly_sales(spec):
+    return measure_by('transaction_hour', 'total_sales', spec)
+
+
+def store_comparison(spec):
+    # Total sales and average value per sales row for every store, highest sales first
+    store_rollup = rollup('store_location', **spec)
+    stores = store_rollup[['total_sales']].assign(
+        avg_transaction_value=store_rollup['total_sales'] / store_rollup['row_count'])
+    return stores.sort_values('total_sales', ascending=False)
+
+
+def weekday_hour_heatmap(spec):
+    # Day of week x hour sales; hours a store had no sales in stay empty. Memoized per filter state
+    return memoized('weekday_hour_heatmap', lambda spec: measure_by(
+        ['day_of_week', 'transaction_hour'], 'total_sales', spec).unstack().reindex(WEEKDAYS), spec)
@@ -0,0 +1,28 @@
+import market_basket
+from analytics.common import memoized
+
+
+def baskets(spec, min_support=market_basket.MIN_SUPPORT, max_size=market_basket.MAX_ITEMSET_SIZE):
+    # Frequent itemsets and top pairs of the selected transactions, memoized per filter state and support.
+    # The sparse matrix itself is not kept.
+    def compute(spec):
+        matrix, labels = market_basket.basket_matrix(**spec)
+        return {
+            'transactions': matrix.shape[0],
+            'items': matrix.shape[1],
+            'itemsets': market_basket.frequent_itemsets(matrix, labels, min_support, max_size),
+            'top_pairs': market_basket.top_pairs(matrix, labels, 10),
+        }
+    return memoized(f'baskets:{min_support}:{max_size}', compute, spec)
+
+
+def rules(spec, min_support=market_basket.MIN_SUPPORT, min_confidence=market_basket.MIN_CONFIDENCE):
+    # Association rules with the items joined into readable text
+    found = market_basket.association_rules(baskets(spec, min_support)['itemsets'], min_confidence)
+    return found.assign(antecedent=found['antecedent'].map(" + ".join),
+                        consequent=found['consequent'].map(" + ".join))
+
+
+def top_pairs(spec, min_support=market_basket.MIN_SUPPORT):
+    pairs = baskets(spec, min_support)['top_pairs']
+    return pairs.assign(pair=pairs['item_a'].astype(str) + " + " + pairs['item_b'].astype(str))
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from data_loader import load_rows
+from query import totals
+from transactions import transaction_count
+
+# Spend levels of a sales row
+SPEND_BINS = [0, 10, 50, 100, 500]
+SPEND_LABELS = ['Low', 'Medium', 'High', 'Premium']
+
+
+def summary(spec):
+    total_transactions = transaction_count(**spec)
+    total_sales = totals(**spec)['total_sales']
+    return {
+        'total_transactions': total_transactions,
+        'total_sales': total_sales,
+        'avg_spend_per_transaction': total_sales / total_transactions,
+    }
+
+
+def spend_levels(spec):
+    # Spend level of each sales row, assuming total_sales represents spending level
+    rows = load_rows(['transaction_qty', 'product_detail', 'total_sales'], **spec)
+    return rows.assign(spend_level=pd.cut(rows['total_sales'], bins=SPEND_BINS, labels=SPEND_LABELS))
+
+
+def top_products_for_level(levels, spend_level, n=10):
+    # Top products by units among the rows of one spend level, from spend_levels()
+    segment = levels[levels['spend_level'] == spend_level]
+    return segment.groupby('product_detail', observed=True)['transaction_qty'].sum().sort_values(
+        ascending=False).head(n).reset_index()
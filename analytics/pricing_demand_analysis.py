@@ -0,0 +1,77 @@
+import numpy as np
+
+import elasticity
+from analytics.common import memoized
+from data_loader import load_rows, member_mask
+
+
+def _price_bounds(spec):
+    prices = load_rows(['unit_price'], **spec)['unit_price']
+    return float(prices.min()), float(prices.max())
+
+
+def price_bounds(spec=None):
+    return memoized('price_bounds', _price_bounds, spec or {})
+
+
+def _price_points(spec):
+    rows = load_rows(['product_detail', 'unit_price', 'transaction_qty'], **spec)
+    return rows.groupby(['unit_price', 'transaction_qty', 'product_detail'], observed=True).size().rename(
+        'rows').reset_index()
+
+
+def price_points(spec, price_range=None):
+    # The selection's sales rows as distinct (price, quantity, product) points and the number of rows behind
+    # each, optionally inside a (min, max) unit price range. Every chart of the page is drawn from these, so only
+    # they are memoized per selection, not the rows, and moving the price slider only filters them again.
+    points = memoized('price_points', _price_points, spec)
+    if price_range is not None:
+        points = points[points['unit_price'].between(*price_range)]
+    return points
+
+
+def summary(points):
+    rows = points['rows'].sum()
+    return {
+        'avg_price': (points['unit_price'] * points['rows']).sum() / rows if rows else float('nan'),
+        'max_price': points['unit_price'].max(),
+        'min_price': points['unit_price'].min(),
+        'total_demand': (points['transaction_qty'] * points['rows']).sum(),
+    }
+
+
+def _units(points):
+    return points.assign(transaction_qty=points['transaction_qty'] * points['rows'],
+                         price_sum=points['unit_price'] * points['rows'])
+
+
+def price_demand(points):
+    # Units sold at each price point
+    return _units(points).groupby('unit_price')['transaction_qty'].sum().reset_index()
+
+
+def elasticities(spec, price_range=None):
+    # Per-product log-log price elasticities with confidence intervals. The fits are memoized per date range
+    # (and any store filter); category, product and price range selections are rows of the fitted table.
+    product_filters = {key: value for key, value in spec.items() if key in elasticity.PRODUCT_KEYS}
+    fit_spec = {key: value for key, value in spec.items() if key not in product_filters}
+    table = memoized('elasticities', lambda fit_spec: elasticity.fit_elasticities(
+        elasticity.demand_observations(**fit_spec)), fit_spec)
+    if product_filters:
+        table = table[member_mask(table, product_filters)]
+    if price_range is not None:
+        table = table[table['avg_price'].between(*price_range)]
+    return table.reset_index(drop=True)
+
+
+def average_elasticity(table):
+    # Units-weighted mean elasticity of the products that could be fitted
+    fitted = table[table['elasticity'].notna()]
+    return np.average(fitted['elasticity'], weights=fitted['units']) if len(fitted) else float('nan')
+
+
+def product_price_points(points):
+    # Average price (per sales row) and units sold per product
+    products = _units(points).groupby('product_detail', observed=True)[['price_sum', 'rows', 'transaction_qty']].sum()
+    products['unit_price'] = products['price_sum'] / products['rows']
+    return products[['unit_price', 'transaction_qty']].reset_index()
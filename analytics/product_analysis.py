@@ -0,0 +1,59 @@
+from analytics.common import histogram, memoized
+from data_loader import load_rows
+from query import aggregate, count_distinct
+
+# Every cube aggregate the page shows, as (by, measure, how)
+AGGREGATES = {
+    'type_quantity': ('product_type', 'transaction_qty', 'sum'),
+    'type_sales': ('product_type', 'total_sales', 'sum'),
+    'type_unit_price_sum': ('product_type', 'unit_price', 'sum'),
+    'type_rows': ('product_type', 'unit_price', 'count'),
+    'product_quantity': ('product_detail', 'transaction_qty', 'sum'),
+    'product_sales': ('product_detail', 'total_sales', 'sum'),
+}
+
+# Product measures top_products() can rank by
+PRODUCT_MEASURES = {'transaction_qty': 'product_quantity', 'total_sales': 'product_sales'}
+
+
+def aggregates(spec):
+    # All of AGGREGATES in one pass over the filtered cube, memoized per filter state
+    return memoized('product_analysis', lambda spec: aggregate(AGGREGATES, **spec), spec)
+
+
+def kpis(spec):
+    results = aggregates(spec)
+    return {
+        'total_revenue': results['type_sales'].sum(),
+        'total_quantity': results['type_quantity'].sum(),
+        'unique_products': count_distinct('product_id', **spec),
+        'avg_unit_price': results['type_unit_price_sum'].sum() / results['type_rows'].sum(),
+    }
+
+
+def top_products(spec, measure, n=10):
+    return aggregates(spec)[PRODUCT_MEASURES[measure]].nlargest(n)
+
+
+def product_types(spec):
+    # Units, revenue and average unit price per product type
+    results = aggregates(spec)
+    return results['type_quantity'].to_frame().assign(
+        total_sales=results['type_sales'],
+        avg_unit_price=results['type_unit_price_sum'] / results['type_rows'])
+
+
+def unit_prices(spec):
+    # Unit price of every sales row, for the price distribution
+    return load_rows(['unit_price'], **spec)
+
+
+def unit_price_histogram(spec, bins=20):
+    # Binned unit prices of the sales rows, memoized per filter state
+    return memoized(f'unit_price_histogram:{bins}', lambda spec: histogram(unit_prices(spec)['unit_price'], bins),
+                    spec)
+
+
+def most_expensive_products(spec, n=10):
+    rows = load_rows(['product_detail', 'unit_price'], **spec)
+    return rows.sort_values(by='unit_price', ascending=False).drop_duplicates(subset='product_detail').head(n)
@@ -0,0 +1,45 @@
+from profitability import profit_rollup, unit_costs
+
+
+def cost_table(spec):
+    # Distinct average costs of each product type's products
+    costs = unit_costs(**spec)[['product_type', 'average_cost']].drop_duplicates()
+    return costs.sort_values(by=['product_type', 'average_cost'], ignore_index=True)
+
+
+def profit_by_type(spec):
+    profit = profit_rollup('product_type', **spec)
+    profit['avg_cost_per_unit'] = profit['cost'] / profit['transaction_qty']
+    return profit
+
+
+def profit_summary(profit):
+    # Totals of profit_by_type()
+    total_sales = profit['total_sales'].sum()
+    total_profit = profit['profit'].sum()
+    return {
+        'total_sales': total_sales,
+        'total_cost': profit['cost'].sum(),
+        'total_profit': total_profit,
+        'avg_profit_margin': (total_profit / total_sales) * 100 if total_sales > 0 else 0,
+    }
+
+
+def product_profit(spec):
+    # Units, profit and profit per unit for every product
+    products = profit_rollup('product_detail', **spec)[['transaction_qty', 'profit']]
+    products['profit_per_unit'] = products['profit'] / products['transaction_qty']
+    return products
+
+
+def high_demand_low_profit(products):
+    # Products selling more units than average while earning less than average per unit, from product_profit()
+    return products[(products['transaction_qty'] > products['transaction_qty'].mean()) &
+                    (products['profit_per_unit'] < products['profit_per_unit'].mean())]
+
+
+def profit_trend(spec, by=None):
+    # Monthly sales, cost, profit and margin, optionally split by a dimension such as product_type
+    trend = profit_rollup(['year_month'] + ([by] if by else []), **spec).reset_index()
+    trend['month'] = trend['year_month'].dt.to_timestamp()  # Period to timestamp for plotting
+    return trend
@@ -0,0 +1,57 @@
+from analytics.common import WEEKDAYS, memoized, sales_kpis
+from query import aggregate
+
+# Resampling rule of each trend frequency; months are labelled by their start, which every pandas release accepts
+TREND_FREQUENCIES = {'Daily': None, 'Weekly': 'W', 'Monthly': 'MS'}
+
+# Every cube aggregate the page shows, as (by, measure, how)
+AGGREGATES = {
+    'daily_sales': ('transaction_date', 'total_sales', 'sum'),
+    'category_sales': ('product_category', 'total_sales', 'sum'),
+    'type_sales': ('product_type', 'total_sales', 'sum'),
+    'location_sales': ('store_location', 'total_sales', 'sum'),
+    'store_category_sales': (['store_location', 'product_category'], 'total_sales', 'sum'),
+    'product_quantity': ('product_detail', 'transaction_qty', 'sum'),
+    'weekday_average_sales': ('day_of_week', 'total_sales', 'mean'),
+}
+
+
+def aggregates(spec):
+    # All of AGGREGATES in one pass over the filtered cube, memoized per filter state
+    return memoized('sales_overview', lambda spec: aggregate(AGGREGATES, **spec), spec)
+
+
+def kpis(spec):
+    return sales_kpis(spec)
+
+
+def sales_trend(spec, frequency='Daily'):
+    daily_sales = aggregates(spec)['daily_sales']
+    rule = TREND_FREQUENCIES[frequency]
+    return daily_sales if rule is None else daily_sales.resample(rule).sum()
+
+
+def category_sales(spec):
+    return aggregates(spec)['category_sales']
+
+
+def top_product_types(spec, n=10):
+    return aggregates(spec)['type_sales'].nlargest(n)
+
+
+def location_sales(spec, ascending=False):
+    return aggregates(spec)['location_sales'].sort_values(ascending=ascending)
+
+
+def store_category_pivot(spec):
+    # Store x category sales, zero where a store sold nothing in a category
+    return aggregates(spec)['store_category_sales'].unstack(fill_value=0)
+
+
+def top_products_by_quantity(spec, n=5):
+    return aggregates(spec)['product_quantity'].nlargest(n)
+
+
+def weekday_average_sales(spec):
+    # Average sales per sales row on each day of the week
+    return aggregates(spec)['weekday_average_sales'].reindex(WEEKDAYS)
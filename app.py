@@ -1,6 +1,5 @@
 import streamlit as st
 from multiapp import MultiApp
-from apps import home, sales_overview, product_analysis, customer_behavior, location_performance, profitability_analysis, inventory_stock_analysis, customer_insights_and_loyalty, pricing_demand_analysis, forecasting_predictive_analysis, marketing_insights, introduction
 
 # Set up Streamlit page configuration
 st.set_page_config(page_title="Coffee Shop Dashboard", layout="wide")
@@ -8,19 +7,21 @@ st.set_page_config(page_title="Coffee Shop Dashboard", layout="wide")
 # Create MultiApp instance
 app = MultiApp()
 
-# Add all pages, including the new Introduction page
-app.add_app("Introduction", introduction.app)
-app.add_app("Home", home.app)
-app.add_app("Sales Overview", sales_overview.app)
-app.add_app("Product Analysis", product_analysis.app)
-app.add_app("Customer Behavior", customer_behavior.app)
-app.add_app("Location Performance", location_performance.app)
-app.add_app("Profitability Analysis", profitability_analysis.app)
-app.add_app("Inventory Stock Analysis", inventory_stock_analysis.app)
-app.add_app("Customer Insights And Loyalty", customer_insights_and_loyalty.app)
-app.add_app("Pricing Demand Analysis", pricing_demand_analysis.app)
-app.add_app("Forecasting Predictive Analysis", forecasting_predictive_analysis.app)
-app.add_app("Marketing Insights", marketing_insights.app)
+# Add all pages, including the new Introduction page. Pages are given by module path,
+# so each one (and heavy dependencies like statsmodels) is only imported when first opened.
+app.add_app("Introduction", "apps.introduction")
+app.add_app("Home", "apps.home")
+app.add_app("Sales Overview", "apps.sales_overview")
+app.add_app("Product Analysis", "apps.product_analysis")
+app.add_app("Customer Behavior", "apps.customer_behavior")
+app.add_app("Location Performance", "apps.location_performance")
+app.add_app("Profitability Analysis", "apps.profitability_analysis")
+app.add_app("Inventory Stock Analysis", "apps.inventory_stock_analysis")
+app.add_app("Customer Insights And Loyalty", "apps.customer_insights_and_loyalty")
+app.add_app("Pricing Demand Analysis", "apps.pricing_demand_analysis")
+app.add_app("Forecasting Predictive Analysis", "apps.forecasting_predictive_analysis")
+app.add_app("Marketing Insights", "apps.marketing_insights")
+app.add_app("Market Basket Analysis", "apps.market_basket_analysis")
 
 # Run the app
 app.run()
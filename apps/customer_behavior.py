@@ -1,32 +1,29 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
+import charts
+from analytics import customer_behavior as analysis
+from data_loader import SLOT_MINUTES, date_bounds
 
 
 def app():
     st.title("Customer Behavior Analysis")
     st.write("Insights into customer purchase patterns, including peak hours, transaction values, and segmentation.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-    data['transaction_hour'] = pd.to_datetime(data['transaction_time'], format='%H:%M:%S').dt.hour
-    data['day_of_week'] = data['transaction_date'].dt.day_name()
-
     # Sidebar filter for Date Range
     st.sidebar.header("Filters")
-    start_date = st.sidebar.date_input("Start Date", value=data['transaction_date'].min())
-    end_date = st.sidebar.date_input("End Date", value=data['transaction_date'].max())
-    filtered_data = data[(data['transaction_date'] >= pd.to_datetime(start_date)) &
-                         (data['transaction_date'] <= pd.to_datetime(end_date))]
+    min_date, max_date = date_bounds()
+    start_date = st.sidebar.date_input("Start Date", value=min_date, key="customer_behavior.start_date")
+    end_date = st.sidebar.date_input("End Date", value=max_date, key="customer_behavior.end_date")
+
+    # Filter spec for the selected date range
+    spec = dict(start_date=start_date, end_date=end_date)
 
     # Peak Purchase Hours
     st.write("## Peak Purchase Times")
     col1, col2 = st.columns(2)
 
     with col1:
-        hourly_sales = filtered_data.groupby('transaction_hour')['total_sales'].sum()
+        hourly_sales = analysis.hourly_sales(spec)
         fig = px.bar(hourly_sales, x=hourly_sales.index, y=hourly_sales.values,
                      labels={"x": "Hour of Day", "y": "Total Sales ($)"},
                      title="Total Sales by Hour of Day",
@@ -34,50 +31,45 @@ def app():
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
-        weekday_sales = filtered_data.groupby('day_of_week')['total_sales'].sum().reindex(
-            ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        )
+        weekday_sales = analysis.sales_by_weekday(spec)
         fig = px.bar(weekday_sales, x=weekday_sales.index, y=weekday_sales.values,
                      labels={"x": "Day of the Week", "y": "Total Sales ($)"},
                      title="Total Sales by Day of the Week",
                      color=weekday_sales.values, color_continuous_scale='Greens')
         st.plotly_chart(fig, use_container_width=True)
 
+    # Intraday Staffing Curve: average transactions per 15-minute slot per trading day
+    st.write(f"## Intraday Staffing Curve ({SLOT_MINUTES}-Minute Slots)")
+    slot_transactions = analysis.staffing_curve(spec)
+    fig = px.line(x=slot_transactions.index, y=slot_transactions.values,
+                  labels={"x": "Time of Day", "y": "Avg. Transactions per Day"},
+                  title=f"Average Transactions per {SLOT_MINUTES}-Minute Slot",
+                  markers=True)
+    st.plotly_chart(fig, use_container_width=True)
+
     # Analysis of Average Basket Size and Transaction Value
     st.write("## Basket Size and Transaction Value Analysis")
     col3, col4 = st.columns(2)
+    transactions = analysis.transaction_totals(spec)
 
     # Basket Size Distribution
     with col3:
-        basket_sizes = filtered_data.groupby('transaction_id')['transaction_qty'].sum()
-        fig = px.histogram(basket_sizes, x=basket_sizes.values, nbins=20,
-                           labels={"x": "Items per Transaction", "y": "Frequency"},
-                           title="Distribution of Basket Sizes",
-                           color_discrete_sequence=['teal'])
+        fig = charts.histogram(analysis.basket_size_histogram(spec, 20), x_label="Items per Transaction",
+                               y_label="Frequency", title="Distribution of Basket Sizes", color='teal')
         st.plotly_chart(fig, use_container_width=True)
 
     # Transaction Value Distribution
     with col4:
-        transaction_values = filtered_data.groupby('transaction_id')['total_sales'].sum()
-        fig = px.histogram(transaction_values, x=transaction_values.values, nbins=20,
-                           labels={"x": "Transaction Value ($)", "y": "Frequency"},
-                           title="Distribution of Transaction Values",
-                           color_discrete_sequence=['orange'])
+        fig = charts.histogram(analysis.transaction_value_histogram(spec, 20), x_label="Transaction Value ($)",
+                               y_label="Frequency", title="Distribution of Transaction Values", color='orange')
         st.plotly_chart(fig, use_container_width=True)
 
     # Transaction-Based Segmentation Based on Spending Behavior
     st.write("## Transaction Segmentation")
 
-    # Use total sales per transaction for segmentation
-    transaction_spending = filtered_data.groupby('transaction_id')['total_sales'].sum()
-
-    # Define segmentation labels and bins based on transaction values
-    bins = [0, 20, 100, 200, float('inf')]
-    labels = ['Low Value', 'Moderate Value', 'High Value', 'Very High Value']
-    transaction_segments = pd.cut(transaction_spending, bins=bins, labels=labels)
-
-    # Count the number of transactions in each segment
-    segment_counts = transaction_segments.value_counts().reindex(labels)
+    # Segment transactions by their total sales
+    segments = analysis.segments(transactions)
+    segment_counts = segments['transactions']
 
     # Pie chart for transaction segment distribution
     fig = px.pie(
@@ -90,7 +82,7 @@ def app():
     st.plotly_chart(fig, use_container_width=True)
 
     # Average Transaction Value by Segment
-    avg_transaction_value_by_segment = transaction_spending.groupby(transaction_segments).mean()
+    avg_transaction_value_by_segment = segments['avg_value']
     fig = px.bar(
         avg_transaction_value_by_segment,
         x=avg_transaction_value_by_segment.index,
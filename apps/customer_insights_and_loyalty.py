@@ -1,18 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from analytics import customer_insights_and_loyalty as analysis
 
 def app():
     st.title("Customer Insights and Loyalty Analysis (Transaction-Based)")
     st.write("An interactive analysis of transaction patterns, focusing on popular products and transaction trends.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
+    # Whole dataset, no filters
+    spec = {}
 
     # Popular Products in Transactions
     st.write("## Popular Products in Transactions")
-    popular_products = data.groupby('product_detail')['transaction_qty'].sum().sort_values(ascending=False).head(10).reset_index()
+    popular_products = analysis.popular_products(spec, 10)
 
     fig = px.bar(
         popular_products,
@@ -28,8 +27,7 @@ def app():
 
     # Monthly Transaction Trends
     st.write("## Monthly Transaction Trends")
-    data['year_month'] = data['transaction_date'].dt.to_period('M').astype(str)  # Convert Period to string for compatibility
-    monthly_transactions = data.groupby('year_month')['transaction_id'].nunique().reset_index()
+    monthly_transactions = analysis.monthly_transactions(spec)
 
     fig = px.line(
         monthly_transactions,
@@ -44,7 +42,7 @@ def app():
 
     # Additional Insights on Transaction-Based Loyalty
     st.write("## Additional Transaction Insights")
-    st.write(f"""
+    st.write("""
     - **Top 10 popular products in transactions** highlight frequently bought items, which can inform promotional strategies.
     - **Monthly transaction trends** reveal seasonal trends or peak periods in transaction frequency, which can guide inventory and marketing efforts.
     """)
@@ -1,48 +1,34 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from statsmodels.tsa.arima.model import ARIMA
-from datetime import timedelta
+import forecast_engine
+from analytics import forecasting_predictive_analysis as analysis
+from batch_forecast import load_results
+from query import members
 
 
 def app():
     st.title("Forecasting and Predictive Analysis")
     st.write("An interactive analysis of sales forecasting, demand prediction, and peak time projections.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-
     # Prepare data for forecasting
-    sales_data = data.groupby('transaction_date')['total_sales'].sum().reset_index()
+    spec = {}
+    sales_data = analysis.daily_sales(spec)
 
     # Analysis Summary
     st.write("## Forecasting Analysis Summary")
-
-    # Calculate summary metrics
-    total_sales = sales_data['total_sales'].sum()
-    avg_daily_sales = sales_data['total_sales'].mean()
-    last_sales_date = sales_data['transaction_date'].max()
+    summary = analysis.sales_summary(sales_data)
 
     st.write(f"""
-    - **Total Sales (Historical)**: ${total_sales:,.2f}
-    - **Average Daily Sales**: ${avg_daily_sales:,.2f}
-    - **Last Date of Historical Data**: {last_sales_date.strftime('%Y-%m-%d')}
+    - **Total Sales (Historical)**: ${summary['total_sales']:,.2f}
+    - **Average Daily Sales**: ${summary['avg_daily_sales']:,.2f}
+    - **Last Date of Historical Data**: {summary['last_sales_date'].strftime('%Y-%m-%d')}
     """)
 
     # Forecasting Sales with ARIMA
     st.write("## Sales Forecasting (Next 30 Days)")
 
-    # Set up ARIMA model for the total sales time series
-    sales_series = sales_data.set_index('transaction_date')['total_sales']
-    model = ARIMA(sales_series, order=(5, 1, 0))  # ARIMA model with order (5,1,0)
-    model_fit = model.fit()
-    forecast = model_fit.forecast(steps=30)  # Forecast for the next 30 days
-
-    # Create a DataFrame for forecasted values
-    forecast_dates = pd.date_range(start=last_sales_date + timedelta(days=1), periods=30, freq='D')
-    forecast_df = pd.DataFrame({'transaction_date': forecast_dates, 'forecast_sales': forecast})
+    # ARIMA(5,1,0) on the total sales time series, for the next 30 days
+    forecast_df = analysis.sales_forecast(sales_data, steps=30)
 
     # Plot historical sales and forecasted sales
     fig = go.Figure()
@@ -62,18 +48,13 @@ def app():
     st.write("## Predicted Demand for Key Products")
 
     # Forecast demand for a specific product
-    product = st.selectbox("Select Product for Demand Forecasting", data['product_detail'].unique())
-    product_data = data[data['product_detail'] == product].groupby('transaction_date')[
-        'transaction_qty'].sum().reset_index()
+    product = st.selectbox("Select Product for Demand Forecasting", members('product_detail'),
+                           key="forecasting_predictive_analysis.product")
+    method = st.selectbox("Forecasting Method", list(forecast_engine.METHODS), key="forecasting_predictive_analysis.method")
+    product_data = analysis.product_demand(product, spec)
 
-    # Set up ARIMA model for product demand time series
-    product_series = product_data.set_index('transaction_date')['transaction_qty']
-    product_model = ARIMA(product_series, order=(5, 1, 0))  # ARIMA model for product demand
-    product_model_fit = product_model.fit()
-    product_forecast = product_model_fit.forecast(steps=30)  # Forecast for the next 30 days
-
-    # Create a DataFrame for product forecasted demand
-    product_forecast_df = pd.DataFrame({'transaction_date': forecast_dates, 'forecast_demand': product_forecast})
+    # ARIMA from the batch results or the forecast cache, or one of the vectorized methods
+    product_forecast_df = analysis.product_forecast(product, product_data, method, steps=30)
 
     # Plot historical demand and forecasted demand for the selected product
     fig = go.Figure()
@@ -90,11 +71,20 @@ def app():
     )
     st.plotly_chart(fig, use_container_width=True)
 
+    # Fit diagnostics from the last batch run (`python batch_forecast.py`)
+    batch = load_results()
+    if batch is not None:
+        with st.expander("Batch Forecast Diagnostics"):
+            results = batch["results"]
+            st.write(f"{len(results)} series fitted in {results['fit_seconds'].sum():.1f}s of model time, "
+                     f"by {', '.join(batch['by'])}")
+            st.dataframe(results.drop(columns=['series_key']).sort_values('fit_seconds', ascending=False))
+
     # Projected Peak Times
     st.write("## Projected Peak Times")
 
     # Identify peak demand days in forecast
-    forecast_peak_days = forecast_df[forecast_df['forecast_sales'] > forecast_df['forecast_sales'].quantile(0.9)]
+    forecast_peak_days = analysis.peak_days(forecast_df, 0.9)
 
     st.write("### Projected High-Demand Days (Top 10%)")
     st.dataframe(forecast_peak_days[['transaction_date', 'forecast_sales']].rename(
@@ -102,7 +92,7 @@ def app():
 
     # Additional Insights for Forecasting
     st.write("## Additional Insights for Forecasting")
-    st.write(f"""
+    st.write("""
     - **30-Day Sales Forecast**: Indicates expected sales trends, which can guide inventory and staffing.
     - **Product Demand Forecast**: Helps anticipate demand for key products, improving supply planning.
     - **Peak Time Projections**: Identifies high-demand days, useful for resource allocation and promotional planning.
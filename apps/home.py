@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
+from analytics import home as analysis
+from data_loader import date_bounds
+from query import members
 
 
 def app():
@@ -9,44 +10,34 @@ def app():
     st.write(
         "Welcome to the Coffee Shop Sales Dashboard! Get insights into sales trends, product performance, and customer behaviors across all store locations.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-
     # Sidebar filters for interactivity
     st.sidebar.header("Filter Options")
-    category_options = data['product_category'].unique()
-    selected_category = st.sidebar.selectbox("Product Category", category_options)
+    category_options = members('product_category')
+    selected_category = st.sidebar.selectbox("Product Category", category_options, key="home.category")
 
     # Date Range Filter
     st.sidebar.subheader("Select Date Range")
-    start_date = st.sidebar.date_input("Start Date", data['transaction_date'].min())
-    end_date = st.sidebar.date_input("End Date", data['transaction_date'].max())
+    min_date, max_date = date_bounds()
+    start_date = st.sidebar.date_input("Start Date", min_date, key="home.start_date")
+    end_date = st.sidebar.date_input("End Date", max_date, key="home.end_date")
 
-    # Filter data based on sidebar selections
-    filtered_data = data[(data['product_category'] == selected_category) &
-                         (data['transaction_date'] >= pd.to_datetime(start_date)) &
-                         (data['transaction_date'] <= pd.to_datetime(end_date))]
+    # Filter spec for the sidebar selections
+    spec = dict(start_date=start_date, end_date=end_date, product_category=selected_category)
 
     # Display key metrics for the selected category and date range
     st.write(f"## Key Metrics for {selected_category} Category")
-    total_sales = filtered_data['total_sales'].sum()
-    total_transactions = filtered_data['transaction_id'].nunique()
-    avg_transaction_value = filtered_data['total_sales'].mean()
-    unique_products = filtered_data['product_id'].nunique()
+    kpis = analysis.kpis(spec)
 
     col1, col2 = st.columns(2)
-    col1.metric("Total Sales", f"${total_sales:,.2f}")
-    col1.metric("Total Transactions", f"{total_transactions}")
-    col2.metric("Average Transaction Value", f"${avg_transaction_value:,.2f}")
-    col2.metric("Unique Products", f"{unique_products}")
+    col1.metric("Total Sales", f"${kpis['total_sales']:,.2f}")
+    col1.metric("Total Transactions", f"{kpis['total_transactions']}",
+                help=f"Estimated, ±{kpis['transactions_error']:.1%}" if kpis['transactions_error'] else None)
+    col2.metric("Average Transaction Value", f"${kpis['avg_transaction_value']:,.2f}")
+    col2.metric("Unique Products", f"{kpis['unique_products']}")
 
     # Monthly Sales Trend
     st.write(f"## Monthly Sales Trend for {selected_category}")
-    monthly_sales = filtered_data.groupby(filtered_data['transaction_date'].dt.to_period("M")).agg(
-        {"total_sales": "sum"}).reset_index()
-    monthly_sales['transaction_date'] = monthly_sales[
-        'transaction_date'].dt.to_timestamp()  # Convert period to timestamp for plotting
+    monthly_sales = analysis.monthly_sales(spec)
 
     fig = px.line(monthly_sales, x='transaction_date', y='total_sales',
                   labels={"transaction_date": "Month", "total_sales": "Total Sales ($)"},
@@ -60,7 +51,7 @@ def app():
     with col3:
         # Sales Distribution by Product Detail
         st.write(f"### Sales Distribution by Product Detail in {selected_category}")
-        product_sales = filtered_data.groupby('product_detail')['total_sales'].sum().reset_index()
+        product_sales = analysis.product_sales(spec)
         fig = px.bar(product_sales, x='total_sales', y='product_detail',
                      labels={"total_sales": "Total Sales ($)", "product_detail": "Product"},
                      title=f"Sales by Product Detail in {selected_category}",
@@ -70,8 +61,7 @@ def app():
     with col4:
         # Peak Sales Hours for selected category
         st.write(f"### Peak Sales Hours in {selected_category}")
-        filtered_data['transaction_hour'] = pd.to_datetime(filtered_data['transaction_time'], format='%H:%M:%S').dt.hour
-        hourly_sales = filtered_data.groupby('transaction_hour')['total_sales'].sum().reset_index()
+        hourly_sales = analysis.hourly_sales(spec)
         fig = px.bar(hourly_sales, x='transaction_hour', y='total_sales',
                      labels={"transaction_hour": "Hour of the Day", "total_sales": "Total Sales ($)"},
                      title="Sales Volume by Hour")
@@ -79,7 +69,7 @@ def app():
 
     # Pie Chart for Sales by Product Type
     st.write(f"## Sales Breakdown by Product Type in {selected_category}")
-    product_type_sales = filtered_data.groupby('product_type')['total_sales'].sum().reset_index()
+    product_type_sales = analysis.product_type_sales(spec)
     fig = px.pie(product_type_sales, values='total_sales', names='product_type',
                  title=f"Sales Breakdown by Product Type in {selected_category}",
                  hole=0.3)
@@ -87,7 +77,7 @@ def app():
 
     # Top 5 Products by Sales Volume for selected category
     st.write(f"## Top 5 Products by Sales Volume in {selected_category}")
-    top_products = filtered_data.groupby('product_detail')['transaction_qty'].sum().nlargest(5).reset_index()
+    top_products = analysis.top_products_by_quantity(spec, 5)
     fig = px.bar(top_products, x='transaction_qty', y='product_detail',
                  orientation='h', labels={"transaction_qty": "Quantity Sold", "product_detail": "Product"},
                  title=f"Top 5 Products by Quantity Sold in {selected_category}")
@@ -1,42 +1,35 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from analytics import inventory_stock_analysis as analysis
+from query import members
 
 def app():
     st.title("Inventory & Stock Analysis")
     st.write("An interactive analysis of inventory metrics, including monthly demand, seasonal patterns, turnover rate, and demand forecasting.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-
     # Sidebar filter for Product Category selection
     st.sidebar.header("Product Category Filter")
-    selected_category = st.sidebar.selectbox("Select a Product Category", data['product_category'].unique())
-
-    # Filter data for the selected category
-    category_data = data[data['product_category'] == selected_category]
+    selected_category = st.sidebar.selectbox("Select a Product Category", members('product_category'),
+                                             key="inventory_stock_analysis.category")
 
-    # Add Year-Month column for monthly aggregation
-    category_data['year_month'] = category_data['transaction_date'].dt.to_period('M')
+    # Filter spec for the selected category
+    spec = dict(product_category=selected_category)
 
     # Top Analysis Summary
     st.write("## Inventory Analysis Summary")
-    total_demand = category_data['transaction_qty'].sum()
-    monthly_demand_avg = category_data.groupby('year_month')['transaction_qty'].sum().mean()
-    inventory_turnover_rate = total_demand / category_data['transaction_id'].nunique()  # Simplified turnover calculation
+    summary = analysis.summary(spec)
+    inventory_turnover_rate = summary['turnover_rate']
 
     st.write(f"""
-    - **Total Demand for {selected_category}**: {total_demand} units
-    - **Average Monthly Demand**: {monthly_demand_avg:.2f} units
+    - **Total Demand for {selected_category}**: {summary['total_demand']} units
+    - **Average Monthly Demand**: {summary['monthly_demand_avg']:.2f} units
     - **Inventory Turnover Rate**: {inventory_turnover_rate:.2f} (units per transaction)
     """)
 
     # Monthly Product Demand
     st.write("## Monthly Product Demand for Stock Requirements")
-    monthly_demand = category_data.groupby('year_month')['transaction_qty'].sum().reset_index()
-    monthly_demand['year_month'] = monthly_demand['year_month'].astype(str)  # Convert for Plotly compatibility
+    monthly_demand = analysis.monthly_demand(spec)
     fig = px.line(
         monthly_demand,
         x='year_month',
@@ -49,8 +42,7 @@ def app():
 
     # Seasonal Demand Patterns
     st.write("## Seasonal Demand Patterns")
-    category_data['month'] = category_data['transaction_date'].dt.month
-    seasonal_demand = category_data.groupby('month')['transaction_qty'].sum().reset_index()
+    seasonal_demand = analysis.seasonal_demand(spec)
 
     fig = px.bar(
         seasonal_demand,
@@ -65,12 +57,7 @@ def app():
 
     # Inventory Turnover Rate Visualization
     st.write("## Inventory Turnover Rate Analysis")
-    turnover_rate_data = category_data.groupby('product_type').agg({
-        'transaction_qty': 'sum',
-        'transaction_id': 'nunique'
-    })
-    turnover_rate_data['turnover_rate'] = turnover_rate_data['transaction_qty'] / turnover_rate_data['transaction_id']
-    turnover_rate_data = turnover_rate_data.sort_values(by='turnover_rate', ascending=False)
+    turnover_rate_data = analysis.turnover_by_type(spec)
 
     fig = px.bar(
         turnover_rate_data,
@@ -85,8 +72,6 @@ def app():
 
     # Demand Forecasting using a Simple Moving Average
     st.write("## Demand Forecasting")
-    monthly_demand['demand_forecast'] = monthly_demand['transaction_qty'].rolling(window=3).mean()  # 3-month moving average
-
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=monthly_demand['year_month'],
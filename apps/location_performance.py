@@ -1,46 +1,37 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
+from analytics import location_performance as analysis
+from data_loader import date_bounds
+from query import members
 
 def app():
     st.title("Location Performance")
     st.write("Comparative analysis of performance across different store locations, including sales, transactions, and peak times.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-    data['transaction_hour'] = pd.to_datetime(data['transaction_time'], format='%H:%M:%S').dt.hour
-    data['day_of_week'] = data['transaction_date'].dt.day_name()
-
     # Sidebar filter for Date Range
     st.sidebar.header("Filters")
-    start_date = st.sidebar.date_input("Start Date", value=data['transaction_date'].min())
-    end_date = st.sidebar.date_input("End Date", value=data['transaction_date'].max())
-    selected_location = st.sidebar.selectbox("Select Store Location", options=data['store_location'].unique())
+    min_date, max_date = date_bounds()
+    start_date = st.sidebar.date_input("Start Date", value=min_date, key="location_performance.start_date")
+    end_date = st.sidebar.date_input("End Date", value=max_date, key="location_performance.end_date")
+    selected_location = st.sidebar.selectbox("Select Store Location", options=members('store_location'),
+                                             key="location_performance.store")
 
-    # Filter data based on the selected date range and location
-    filtered_data = data[(data['transaction_date'] >= pd.to_datetime(start_date)) &
-                         (data['transaction_date'] <= pd.to_datetime(end_date))]
-    location_data = filtered_data[filtered_data['store_location'] == selected_location]
+    # Filter specs for the selected date range, with and without the location
+    period_spec = dict(start_date=start_date, end_date=end_date)
+    location_spec = dict(period_spec, store_location=selected_location)
 
     # Key Metrics for the Selected Location
     st.write(f"## Key Metrics for {selected_location}")
-    total_sales = location_data['total_sales'].sum()
-    transaction_count = location_data['transaction_id'].nunique()
-    avg_transaction_value = location_data['total_sales'].mean()
+    kpis = analysis.kpis(location_spec)
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Sales", f"${total_sales:,.2f}")
-    col2.metric("Transaction Count", f"{transaction_count}")
-    col3.metric("Avg. Transaction Value", f"${avg_transaction_value:.2f}")
+    col1.metric("Total Sales", f"${kpis['total_sales']:,.2f}")
+    col2.metric("Transaction Count", f"{kpis['total_transactions']}")
+    col3.metric("Avg. Transaction Value", f"${kpis['avg_transaction_value']:.2f}")
 
     # Sales by Day of the Week
     st.write(f"## Sales by Day of the Week for {selected_location}")
-    weekday_sales = location_data.groupby('day_of_week')['total_sales'].sum().reindex(
-        ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    )
+    weekday_sales = analysis.sales_by_weekday(location_spec)
     fig = px.bar(weekday_sales, x=weekday_sales.index, y=weekday_sales.values,
                  labels={"x": "Day of the Week", "y": "Total Sales ($)"},
                  title="Total Sales by Day of the Week",
@@ -49,7 +40,7 @@ def app():
 
     # Peak Sales Hours for Selected Location
     st.write(f"## Peak Sales Hours for {selected_location}")
-    hourly_sales = location_data.groupby('transaction_hour')['total_sales'].sum()
+    hourly_sales = analysis.hourly_sales(location_spec)
     fig = px.line(hourly_sales, x=hourly_sales.index, y=hourly_sales.values,
                   labels={"x": "Hour of Day", "y": "Total Sales ($)"},
                   title="Total Sales by Hour of the Day",
@@ -60,7 +51,8 @@ def app():
     st.write("## High-Performing vs. Low-Performing Stores")
 
     # Total sales by location
-    location_sales = filtered_data.groupby('store_location')['total_sales'].sum().sort_values(ascending=False)
+    stores = analysis.store_comparison(period_spec)
+    location_sales = stores['total_sales']
     fig = px.bar(location_sales, x=location_sales.index, y=location_sales.values,
                  labels={"x": "Store Location", "y": "Total Sales ($)"},
                  title="Total Sales by Store Location",
@@ -68,7 +60,7 @@ def app():
     st.plotly_chart(fig, use_container_width=True)
 
     # Average transaction value by location
-    avg_transaction_value_location = filtered_data.groupby('store_location')['total_sales'].mean().sort_values(ascending=False)
+    avg_transaction_value_location = stores['avg_transaction_value'].sort_values(ascending=False)
     fig = px.bar(avg_transaction_value_location, x=avg_transaction_value_location.index, y=avg_transaction_value_location.values,
                  labels={"x": "Store Location", "y": "Avg. Transaction Value ($)"},
                  title="Average Transaction Value by Store Location",
@@ -77,16 +69,12 @@ def app():
 
     # Heatmap of Sales by Hour and Day of the Week for Selected Location
     st.write(f"## Heatmap of Sales by Hour and Day for {selected_location}")
-    heatmap_data = location_data.pivot_table(values='total_sales', index='day_of_week', columns='transaction_hour', aggfunc='sum').reindex(
-        ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    )
+    heatmap_data = analysis.weekday_hour_heatmap(location_spec)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    sns.heatmap(heatmap_data, annot=True, fmt=".0f", cmap="YlGnBu", linewidths=0.5, ax=ax)
-    ax.set_title("Sales Heatmap by Hour and Day of the Week")
-    ax.set_xlabel("Hour of Day")
-    ax.set_ylabel("Day of the Week")
-    st.pyplot(fig)
+    fig = px.imshow(heatmap_data, text_auto=".0f", aspect="auto", color_continuous_scale="YlGnBu",
+                    labels={"x": "Hour of Day", "y": "Day of the Week", "color": "Total Sales ($)"},
+                    title="Sales Heatmap by Hour and Day of the Week")
+    st.plotly_chart(fig, use_container_width=True)
 
     # Additional Insight: Comparison Metrics (Top 5 and Bottom 5 Stores by Sales)
     st.write("## Top 5 and Bottom 5 Stores by Sales")
@@ -0,0 +1,81 @@
+import streamlit as st
+import plotly.express as px
+from analytics import market_basket_analysis as analysis
+from data_loader import date_bounds
+from query import members
+
+def app():
+    st.title("Market Basket Analysis")
+    st.write("Products bought together: frequent itemsets, association rules and the most common product pairs.")
+
+    # Sidebar Filters
+    st.sidebar.header("Filters")
+    min_date, max_date = date_bounds()
+    start_date = st.sidebar.date_input("Start Date", value=min_date, key="market_basket_analysis.start_date")
+    end_date = st.sidebar.date_input("End Date", value=max_date, key="market_basket_analysis.end_date")
+    selected_store = st.sidebar.selectbox("Select Store Location", ['All Stores'] + members('store_location'),
+                                          key="market_basket_analysis.store")
+    min_support = st.sidebar.slider("Minimum Support (%)", 0.1, 5.0, 0.5, 0.1, key="market_basket_analysis.min_support") / 100
+    min_confidence = st.sidebar.slider("Minimum Confidence (%)", 1, 100, 10, key="market_basket_analysis.min_confidence") / 100
+
+    # Filter spec for the selected date range and store
+    spec = dict(start_date=start_date, end_date=end_date)
+    if selected_store != 'All Stores':
+        spec['store_location'] = selected_store
+    baskets = analysis.baskets(spec, min_support)
+    itemsets = baskets['itemsets']
+
+    # Key Metrics
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Transactions", f"{baskets['transactions']:,}")
+    col2.metric("Products", f"{baskets['items']:,}")
+    col3.metric("Frequent Itemsets", f"{len(itemsets):,}")
+
+    # Top Co-Purchased Pairs
+    st.write("## Top Co-Purchased Product Pairs")
+    top_pairs = analysis.top_pairs(spec, min_support)
+    fig = px.bar(
+        top_pairs,
+        x='transactions',
+        y='pair',
+        orientation='h',
+        labels={"transactions": "Transactions", "pair": "Product Pair"},
+        title="Product Pairs Bought Together Most Often",
+        color='support',
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Association Rules
+    st.write("## Association Rules")
+    rules = analysis.rules(spec, min_support, min_confidence)
+    if rules.empty:
+        st.write("No rules reach the selected support and confidence; try lowering the thresholds.")
+    else:
+        fig = px.scatter(
+            rules,
+            x='support',
+            y='confidence',
+            size='lift',
+            color='lift',
+            hover_data={'antecedent': True, 'consequent': True},
+            labels={"support": "Support", "confidence": "Confidence", "lift": "Lift"},
+            title="Association Rules by Support, Confidence and Lift",
+            color_continuous_scale='Viridis'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(rules.head(20).round({'support': 4, 'confidence': 3, 'lift': 2}))
+
+    # Frequent Itemsets
+    st.write("## Frequent Itemsets")
+    multi_item_sets = itemsets[itemsets['size'] > 1]
+    st.dataframe(multi_item_sets.assign(itemset=multi_item_sets['itemset'].map(" + ".join)).head(20).round({'support': 4}))
+
+    # Insights
+    st.write("## Insights")
+    st.write(f"""
+    - **Lift** above 1 means the products are bought together more often than chance would suggest.
+    - **Confidence** is the share of baskets with the first products that also hold the others.
+    - Itemsets and rules are computed for {baskets['transactions']:,} transactions in the selected period and store.
+    """)
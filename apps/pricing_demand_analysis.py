@@ -1,47 +1,44 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import numpy as np
+import charts
+from analytics import pricing_demand_analysis as analysis
+from data_loader import date_bounds
+from query import members
 
 def app():
     st.title("Pricing & Demand Analysis")
     st.write("An interactive analysis of demand elasticity, optimal pricing, and price sensitivity across products.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-
     # Sidebar Filters
     st.sidebar.header("Filters")
-    product_category = st.sidebar.selectbox("Select Product Category", data['product_category'].unique())
-    product_filter = st.sidebar.multiselect("Select Products", options=data[data['product_category'] == product_category]['product_detail'].unique(), default=None)
-    min_price, max_price = st.sidebar.slider("Select Price Range", float(data['unit_price'].min()), float(data['unit_price'].max()), (float(data['unit_price'].min()), float(data['unit_price'].max())))
+    min_date, max_date = date_bounds()
+    start_date = st.sidebar.date_input("Start Date", value=min_date, key="pricing_demand_analysis.start_date")
+    end_date = st.sidebar.date_input("End Date", value=max_date, key="pricing_demand_analysis.end_date")
+    product_category = st.sidebar.selectbox("Select Product Category", members('product_category'), key="pricing_demand_analysis.category")
+    product_filter = st.sidebar.multiselect("Select Products", options=members('product_detail', product_category=product_category), default=None, key="pricing_demand_analysis.products")
+    lowest_price, highest_price = analysis.price_bounds()
+    price_range = st.sidebar.slider("Select Price Range", lowest_price, highest_price, (lowest_price, highest_price), key="pricing_demand_analysis.price_range")
 
     # Filter data based on sidebar inputs
-    pricing_data = data[(data['product_category'] == product_category) &
-                        (data['unit_price'] >= min_price) &
-                        (data['unit_price'] <= max_price)]
+    spec = dict(start_date=start_date, end_date=end_date, product_category=product_category)
     if product_filter:
-        pricing_data = pricing_data[pricing_data['product_detail'].isin(product_filter)]
+        spec['product_detail'] = product_filter
+    pricing_data = analysis.price_points(spec, price_range)
 
     # Analysis Summary
     st.write("## Pricing & Demand Analysis Summary")
-
-    avg_price = pricing_data['unit_price'].mean()
-    max_price = pricing_data['unit_price'].max()
-    min_price = pricing_data['unit_price'].min()
-    total_demand = pricing_data['transaction_qty'].sum()
+    summary = analysis.summary(pricing_data)
 
     st.write(f"""
     - **Selected Category**: {product_category}
-    - **Average Price**: ${avg_price:.2f}
-    - **Price Range**: ${min_price:.2f} - ${max_price:.2f}
-    - **Total Demand**: {total_demand} units
+    - **Average Price**: ${summary['avg_price']:.2f}
+    - **Price Range**: ${summary['min_price']:.2f} - ${summary['max_price']:.2f}
+    - **Total Demand**: {summary['total_demand']} units
     """)
 
     # Demand Elasticity by Price
     st.write("## Demand Elasticity by Price")
-    price_demand = pricing_data.groupby('unit_price')['transaction_qty'].sum().reset_index()
+    price_demand = analysis.price_demand(pricing_data)
 
     fig = px.line(
         price_demand,
@@ -54,17 +51,32 @@ def app():
     )
     st.plotly_chart(fig, use_container_width=True)
 
-    # Elasticity Calculation and Analysis
-    price_demand['demand_elasticity'] = price_demand['transaction_qty'].pct_change() / price_demand['unit_price'].pct_change()
-    avg_elasticity = price_demand['demand_elasticity'].mean()
+    # Elasticity per product, from log-log demand fits over the date range
+    elasticities = analysis.elasticities(spec, price_range)
+    fitted = elasticities[elasticities['elasticity'].notna()].sort_values('elasticity')
+    avg_elasticity = analysis.average_elasticity(elasticities)
 
     st.write("### Demand Elasticity Insights")
-    st.write(f"- **Average Elasticity**: {avg_elasticity:.2f} (Values >1 indicate elastic demand; <1 indicate inelastic demand)")
-    st.write(f"- **Elasticity Analysis**: Higher elasticity suggests that demand is highly sensitive to price changes in the selected range.")
+    st.write(f"- **Average Elasticity**: {avg_elasticity:.2f} across {len(fitted)} of {len(elasticities)} products, weighted by units sold (Values below -1 indicate elastic demand; between -1 and 0 indicate inelastic demand)")
+    st.write("- **Elasticity Analysis**: Products that kept a single price over the selected dates have no elasticity estimate.")
+
+    if len(fitted):
+        fig = px.scatter(
+            fitted,
+            x='elasticity',
+            y='product_detail',
+            error_x=fitted['ci_high'] - fitted['elasticity'],
+            error_x_minus=fitted['elasticity'] - fitted['ci_low'],
+            labels={"elasticity": "Price Elasticity of Demand", "product_detail": "Product"},
+            title="Price Elasticity by Product (95% Confidence Intervals)",
+            hover_data={'observations': True, 'price_points': True, 'units': True}
+        )
+        fig.add_vline(x=-1, line_dash="dash")
+        st.plotly_chart(fig, use_container_width=True)
 
     # Optimal Pricing Points
     st.write("## Optimal Pricing Points")
-    product_avg_prices = pricing_data.groupby('product_detail').agg({'unit_price': 'mean', 'transaction_qty': 'sum'}).reset_index()
+    product_avg_prices = analysis.product_price_points(pricing_data)
 
     fig = px.scatter(
         product_avg_prices,
@@ -82,21 +94,22 @@ def app():
     # Price Sensitivity Analysis for Similar Products
     st.write("## Price Sensitivity Analysis for Selected Products")
 
-    fig = px.scatter(
+    # Distinct price and quantity points of the sales rows, sized by their row count; a density when there are too many
+    fig = charts.scatter(
         pricing_data,
         x='unit_price',
         y='transaction_qty',
         color='product_detail',
-        labels={"unit_price": "Unit Price ($)", "transaction_qty": "Demand (Units)"},
+        labels={"unit_price": "Unit Price ($)", "transaction_qty": "Demand (Units)", "rows": "Rows"},
         title="Price Sensitivity Across Selected Products",
-        size='transaction_qty',
-        hover_data={'product_detail': True}
+        size='rows',
+        hover_data={'product_detail': True, 'rows': True}
     )
     st.plotly_chart(fig, use_container_width=True)
 
     # Additional Insights for Pricing Optimization
     st.write("## Additional Insights for Pricing Optimization")
-    st.write(f"""
+    st.write("""
     - **Demand elasticity** shows how sensitive demand is to price changes in the selected range.
     - **Optimal pricing points** highlight where demand peaks, which helps identify ideal price settings.
     - **Price sensitivity** analysis of similar products aids in competitive pricing within the category.
@@ -1,36 +1,31 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
+import charts
+from analytics import product_analysis as analysis
+from query import members
 
 def app():
     st.title("Product Analysis")
     st.write("Detailed insights into product performance, including categories, types, pricing, and popularity.")
 
-    # Load the dataset
-    data = pd.read_csv("Cleaned_Coffee_Shop_Sales.csv")
-    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
-
     # Sidebar Filters
     st.sidebar.header("Filters")
-    product_category_options = data['product_category'].unique()
-    selected_category = st.sidebar.selectbox("Select a Product Category", product_category_options, index=0)
+    product_category_options = members('product_category')
+    selected_category = st.sidebar.selectbox("Select a Product Category", product_category_options, index=0, key="product_analysis.category")
 
-    # Filter data based on selected product category
-    category_data = data[data['product_category'] == selected_category]
+    # Filter spec for the selected product category
+    spec = dict(product_category=selected_category)
+    product_types = analysis.product_types(spec)
 
     # Key Metrics
     st.write(f"## Key Metrics for {selected_category}")
-    total_revenue = category_data['total_sales'].sum()
-    total_quantity = category_data['transaction_qty'].sum()
-    unique_products = category_data['product_id'].nunique()
-    avg_unit_price = category_data['unit_price'].mean()
+    kpis = analysis.kpis(spec)
 
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Revenue", f"${total_revenue:,.2f}")
-    col2.metric("Total Quantity Sold", f"{total_quantity}")
-    col3.metric("Unique Products", f"{unique_products}")
-    col4.metric("Average Unit Price", f"${avg_unit_price:.2f}")
+    col1.metric("Total Revenue", f"${kpis['total_revenue']:,.2f}")
+    col2.metric("Total Quantity Sold", f"{kpis['total_quantity']}")
+    col3.metric("Unique Products", f"{kpis['unique_products']}")
+    col4.metric("Average Unit Price", f"${kpis['avg_unit_price']:.2f}")
 
     # Product Popularity and Revenue Contribution
     st.write(f"## {selected_category} Product Popularity and Revenue Contribution")
@@ -38,7 +33,7 @@ def app():
 
     with col5:
         # Top 10 Products by Quantity Sold
-        top_products_qty = category_data.groupby('product_detail')['transaction_qty'].sum().nlargest(10)
+        top_products_qty = analysis.top_products(spec, 'transaction_qty', 10)
         fig = px.bar(
             top_products_qty,
             x=top_products_qty.values,
@@ -53,7 +48,7 @@ def app():
 
     with col6:
         # Top 10 Products by Revenue
-        top_products_revenue = category_data.groupby('product_detail')['total_sales'].sum().nlargest(10)
+        top_products_revenue = analysis.top_products(spec, 'total_sales', 10)
         fig = px.bar(
             top_products_revenue,
             x=top_products_revenue.values,
@@ -68,13 +63,12 @@ def app():
 
     # Pricing Distribution
     st.write(f"## Pricing Distribution for {selected_category}")
-    fig = px.histogram(
-        category_data,
-        x='unit_price',
-        nbins=20,
+    # Binned server-side, so the chart carries 20 bins whatever the number of sales rows
+    fig = charts.histogram(
+        analysis.unit_price_histogram(spec, 20),
         title="Unit Price Distribution",
-        labels={"unit_price": "Unit Price ($)"},
-        color_discrete_sequence=['teal']
+        x_label="Unit Price ($)",
+        color='teal'
     )
     st.plotly_chart(fig, use_container_width=True)
 
@@ -84,7 +78,7 @@ def app():
         col7, col8 = st.columns(2)
 
         # Sales Volume by Coffee Type
-        coffee_sales_by_type = category_data.groupby('product_type')['transaction_qty'].sum().sort_values()
+        coffee_sales_by_type = product_types['transaction_qty'].sort_values()
         fig = px.bar(
             coffee_sales_by_type,
             x=coffee_sales_by_type.values,
@@ -98,7 +92,7 @@ def app():
         col7.plotly_chart(fig, use_container_width=True)
 
         # Unit Price Trends by Coffee Type
-        avg_price_by_type = category_data.groupby('product_type')['unit_price'].mean().sort_values()
+        avg_price_by_type = product_types['avg_unit_price'].sort_values()
         fig = px.bar(
             avg_price_by_type,
             x=avg_price_by_type.values,
@@ -113,7 +107,7 @@ def app():
 
     # Additional Insights: Revenue Contribution by Product Type
     st.write(f"## Revenue Contribution by {selected_category} Product Types")
-    product_type_revenue = category_data.groupby('product_type')['total_sales'].sum()
+    product_type_revenue = product_types['total_sales']
 
     fig = px.pie(
         product_type_revenue,
@@ -129,12 +123,7 @@ def app():
     st.write(f"## Most Expensive Products in {selected_category}")
 
     # Filter and sort to get the top 10 most expensive products
-    most_expensive_products = (
-        category_data[['product_detail', 'unit_price']]
-        .sort_values(by='unit_price', ascending=False)
-        .drop_duplicates(subset='product_detail')
-        .head(10)
-    )
+    most_expensive_products = analysis.most_expensive_products(spec, 10)
 
     # Plotting the data in a bar chart
     fig = px.bar(
@@ -0,0 +1,155 @@
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecast_cache import series_key
+from sales_cube import rollup
+
+# Forecasts and fit diagnostics for every series, written by `python batch_forecast.py`
+RESULTS_PATH = "batch_forecasts.pkl"
+
+# Series with fewer daily points than this are not fitted; they get a mean forecast instead
+MIN_OBSERVATIONS = 14
+
+_results = {"mtime": None, "tables": None}
+
+
+def demand_series(by=('product_detail',), measure='transaction_qty'):
+    # Daily series per group, over the dates each group sold on (as the forecasting page builds them)
+    by = list(by)
+    daily = rollup(by + ['transaction_date'])[measure]
+    for keys, series in daily.groupby(level=by, observed=True, sort=True):
+        yield keys if isinstance(keys, tuple) else (keys,), series.droplevel(by)
+
+
+def _fallback(values, steps):
+    # Mean of the last two weeks, for series that are too short or could not be fitted
+    mean = float(np.mean(values[-MIN_OBSERVATIONS:])) if len(values) else np.nan
+    return np.full(steps, mean)
+
+
+def fit_series(task):
+    # Runs in a worker process; returns diagnostics instead of raising, so one bad series never fails the batch
+    keys, series, order, steps = task
+    values = series.to_numpy(dtype='float64')
+    result = {"keys": keys, "series_key": series_key(series, order, steps), "n_obs": len(values), "aic": np.nan,
+              "error": None, "warnings": 0, "last_date": series.index[-1]}
+    from statsmodels.tsa.arima.model import ARIMA
+
+    start = time.perf_counter()
+    if len(values) < MIN_OBSERVATIONS:
+        result.update(status="too_short", forecast=_fallback(values, steps))
+    elif np.ptp(values) == 0:
+        result.update(status="constant", forecast=np.full(steps, values[-1]))
+    else:
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                # Fitted on the values alone: a series with missing days has no date frequency to forecast from
+                model_fit = ARIMA(values, order=order).fit()
+                forecast = np.asarray(model_fit.forecast(steps=steps), dtype='float64')
+            result.update(status="fitted", forecast=forecast, aic=float(model_fit.aic), warnings=len(caught))
+        except Exception as e:  # statsmodels raises a variety of numerical errors
+            result.update(status="failed", forecast=_fallback(values, steps), error=f"{type(e).__name__}: {e}")
+    result["fit_seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(by=('product_detail',), order=(5, 1, 0), steps=30, workers=None):
+    by = list(by)
+    tasks = [(keys, series, tuple(order), steps) for keys, series in demand_series(by)]
+
+    # Large chunks keep inter-process overhead low; several per worker keep the cores evenly loaded
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    if workers == 1:
+        fitted = [fit_series(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fitted = list(pool.map(fit_series, tasks, chunksize=chunksize))
+
+    results = pd.DataFrame([dict(zip(by, r["keys"]), **{k: v for k, v in r.items() if k not in ("keys", "forecast")})
+                            for r in fitted])
+    forecasts = pd.concat([
+        pd.DataFrame(dict(zip(by, r["keys"]),
+                          transaction_date=pd.date_range(r["last_date"] + pd.Timedelta(days=1), periods=steps),
+                          forecast=r["forecast"]))
+        for r in fitted
+    ], ignore_index=True) if fitted else pd.DataFrame(columns=by + ['transaction_date', 'forecast'])
+    return {"by": by, "order": tuple(order), "steps": steps, "results": results, "forecasts": forecasts,
+            "created_at": time.time()}
+
+
+def write_results(tables, path=RESULTS_PATH):
+    # Write next to the target and rename, so the page never reads a half-written table
+    tmp_path = path + ".tmp"
+    pd.to_pickle(tables, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_results(path=RESULTS_PATH):
+    # Re-read only when the job has rewritten the file
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _results["mtime"] != mtime:
+        _results.update(mtime=mtime, tables=pd.read_pickle(path))
+    return _results["tables"]
+
+
+def lookup(series, order=(5, 1, 0), steps=30, path=RESULTS_PATH, **keys):
+    # The batch forecast for one series, or None when there is none for this exact series, order and horizon
+    tables = load_results(path)
+    if tables is None or tables["order"] != tuple(order) or tables["steps"] != steps or set(keys) != set(tables["by"]):
+        return None
+    results = tables["results"]
+    match = results['series_key'] == series_key(series, order, steps)
+    for column, value in keys.items():
+        match &= results[column] == value
+    if not match.any():
+        return None
+
+    forecasts = tables["forecasts"]
+    rows = np.ones(len(forecasts), dtype=bool)
+    for column, value in keys.items():
+        rows &= (forecasts[column] == value).to_numpy()
+    forecast = forecasts.loc[rows].set_index('transaction_date')['forecast']
+    return forecast.rename_axis(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit demand forecasts for every product (or store x product) "
+                                                 "series across all CPU cores.")
+    parser.add_argument("--by", nargs="+", default=['product_detail'],
+                        help="Columns identifying a series, e.g. --by store_location product_detail")
+    parser.add_argument("--steps", type=int, default=30, help="Forecast horizon in days")
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to the number of CPUs)")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables = run_batch(args.by, steps=args.steps, workers=args.workers)
+    write_results(tables, args.output)
+    elapsed = time.perf_counter() - start
+
+    results = tables["results"]
+    print(f"Forecast {len(results)} series in {elapsed:.2f}s wall, {results['fit_seconds'].sum():.2f}s of fitting")
+    print(results['status'].value_counts().to_string())
+    print("\nSlowest fits:")
+    print(results.nlargest(10, 'fit_seconds')[args.by + ['n_obs', 'status', 'fit_seconds']].to_string(index=False))
+    failed = results[results['status'] == 'failed']
+    if len(failed):
+        print("\nFailed fits (mean forecast used):")
+        print(failed[args.by + ['error']].to_string(index=False))
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
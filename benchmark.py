@@ -0,0 +1,185 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+import data_loader
+import synthetic_data
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak memory is not reported there
+    resource = None
+
+BENCH_DIR = "bench_data"
+
+# Pages without dataset computations are left out by default
+SKIP_PAGES = ['apps.introduction']
+
+# A page regresses when it gets this much slower or bigger than the baseline (and by more than the noise floor)
+TOLERANCE = 1.25
+NOISE_SECONDS = 0.05
+NOISE_MB = 20
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def dataset_dir(rows, stores, products):
+    return os.path.join(BENCH_DIR, f"rows-{rows}-stores-{stores}-products-{products}")
+
+
+def ensure_dataset(rows, stores, products, build_snapshot=False):
+    # Generated once per scale and reused by later runs
+    directory = dataset_dir(rows, stores, products)
+    path = os.path.join(directory, data_loader.DATA_PATH)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        start = time.perf_counter()
+        synthetic_data.write_csv(path + ".tmp", rows, stores=stores, products=products)
+        os.replace(path + ".tmp", path)
+        print(f"Generated {rows:,} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    snapshot = data_loader.snapshot
+    snapshot_file = data_loader.snapshot_path(path)
+    current = (snapshot is not None and os.path.exists(snapshot_file) and
+               snapshot.source_fingerprint(snapshot_file) == data_loader.fingerprint(path))
+    if build_snapshot and not current:
+        snapshot.write_snapshot(path)
+    elif not build_snapshot and snapshot is not None:
+        # The CSV path is being measured, so the loader must not find a snapshot
+        for stale in snapshot.snapshot_files(path):
+            if os.path.exists(stale):
+                os.remove(stale)
+    return directory
+
+
+def _peak_mb():
+    if resource is None:
+        return float("nan")
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_page(module):
+    # Runs in a fresh interpreter inside the dataset directory. Outside `streamlit run`, Streamlit calls
+    # execute in bare mode: nothing is displayed and widgets return their default values.
+    import importlib
+    import logging
+    import tempfile
+
+    import streamlit.logger
+    import forecast_cache
+    import profiling
+
+    streamlit.logger.set_log_level(logging.ERROR)
+    # Forecasts cached on disk by an earlier run would make the cold run warm
+    forecast_cache.CACHE_DIR = tempfile.mkdtemp(prefix="forecast_cache-")
+    start = time.perf_counter()
+    page = importlib.import_module(module)
+    result = {"page": module, "import_seconds": time.perf_counter() - start, "error": None}
+    try:
+        for run in ("cold", "warm"):
+            with profiling.page_run(module) as record:
+                page.app()
+            result[f"{run}_seconds"] = record["seconds"]
+            if run == "cold":
+                result["phases"] = {name: round(p["seconds"], 4) for name, p in record["phases"].items()
+                                    if "/" not in name}
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["peak_mb"] = _peak_mb()
+    print(json.dumps(result))
+
+
+def benchmark(scales, stores, products, pages, build_snapshot=False, out_of_core=False):
+    results = []
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    if out_of_core:
+        env["DASHBOARD_OUT_OF_CORE"] = "1"
+    for rows in scales:
+        directory = ensure_dataset(rows, stores, products, build_snapshot)
+        for page in pages:
+            # A fresh interpreter per page, so caches start cold and peak memory belongs to that page
+            process = subprocess.run([sys.executable, os.path.join(REPO_DIR, "benchmark.py"), "--run-page", page],
+                                     cwd=directory, capture_output=True, text=True,
+                                     env=env)
+            lines = process.stdout.strip().splitlines()
+            if process.returncode or not lines:
+                result = {"page": page, "error": (process.stderr.strip().splitlines() or ["no output"])[-1]}
+            else:
+                result = json.loads(lines[-1])
+            result.update(rows=rows, stores=stores, products=products, snapshot=build_snapshot,
+                          out_of_core=out_of_core)
+            results.append(result)
+            print(f"{rows:>12,} {page:<45} {result.get('cold_seconds', float('nan')):8.3f}s "
+                  f"{result.get('peak_mb', float('nan')):8.1f} MB {result['error'] or ''}", file=sys.stderr)
+    return results
+
+
+def regressions(results, baseline, tolerance=TOLERANCE):
+    # Pages that got slower or bigger than the same page at the same scale in the baseline
+    key = lambda r: (r["rows"], r["stores"], r["products"], r["snapshot"], r.get("out_of_core", False), r["page"])
+    previous = {key(r): r for r in baseline}
+    found = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None or result["error"] or old["error"]:
+            continue
+        for measure, noise in (("cold_seconds", NOISE_SECONDS), ("warm_seconds", NOISE_SECONDS),
+                               ("peak_mb", NOISE_MB)):
+            if result[measure] > old[measure] * tolerance and result[measure] - old[measure] > noise:
+                found.append(f"{result['page']} at {result['rows']:,} rows: {measure} "
+                             f"{old[measure]:.3f} -> {result[measure]:.3f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every dashboard page headless on synthetic data at "
+                                                 "several scales and report time and peak memory.")
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e6], help="Scales to run, e.g. 1e6 1e7 1e8")
+    parser.add_argument("--stores", type=int, default=3)
+    parser.add_argument("--products", type=int, default=80)
+    parser.add_argument("--pages", nargs="+", help="Page modules to run (defaults to every page in apps/)")
+    parser.add_argument("--snapshot", action="store_true", help="Load from an Arrow snapshot instead of the CSV")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Run the pages in out-of-core mode (DASHBOARD_OUT_OF_CORE=1), streaming the CSV in chunks")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run; exit non-zero on regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--run-page", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.snapshot and data_loader.snapshot is None:
+        parser.error("--snapshot needs pyarrow")
+
+    if args.run_page:
+        run_page(args.run_page)
+        return
+
+    pages = args.pages or sorted(set("apps." + os.path.basename(p)[:-3]
+                                     for p in glob.glob(os.path.join(REPO_DIR, "apps", "*.py"))) - set(SKIP_PAGES))
+    results = benchmark([int(rows) for rows in args.rows], args.stores, args.products, pages, args.snapshot,
+                        args.out_of_core)
+
+    table = pd.DataFrame(results).set_index(['rows', 'page'])
+    columns = [c for c in ['import_seconds', 'cold_seconds', 'warm_seconds', 'peak_mb', 'error']
+               if c in table]
+    print(table[columns].to_string(float_format=lambda x: f"{x:.3f}"))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        if found:
+            sys.exit("Regressions against the baseline:\n" + "\n".join(found))
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
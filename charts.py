@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Point charts with more rows than this are drawn from aggregated points instead of one marker per row
+MAX_POINTS = 5000
+
+# When even the distinct (x, y, color) combinations are more than this, a binned 2-D density is drawn instead
+MAX_AGGREGATED_POINTS = 20000
+
+# Markers are drawn with WebGL from this many points
+WEBGL_POINTS = 1000
+
+DENSITY_BINS = 60
+
+
+def aggregate_points(data, x, y, color=None):
+    # Distinct (x, y, color) combinations with the number of rows behind each one. Data that is already
+    # aggregated carries those counts in a `rows` column, and they add up.
+    keys = [x, y] + ([color] if color else [])
+    if 'rows' in data:
+        return data.groupby(keys, observed=True)['rows'].sum().reset_index()
+    return data.groupby(keys, observed=True).size().rename('rows').reset_index()
+
+
+def density(data, x, y, bins=DENSITY_BINS):
+    # Row counts on an x by y grid, binned here so only the grid is sent to the browser
+    counts, x_edges, y_edges = np.histogram2d(data[x].to_numpy(dtype=float), data[y].to_numpy(dtype=float), bins,
+                                              weights=data['rows'].to_numpy() if 'rows' in data else None)
+    return pd.DataFrame(counts.T, index=pd.Index((y_edges[:-1] + y_edges[1:]) / 2, name=y),
+                        columns=pd.Index((x_edges[:-1] + x_edges[1:]) / 2, name=x))
+
+
+def scatter(data, x, y, color=None, size=None, title=None, labels=None, hover_data=None, max_points=MAX_POINTS,
+            **options):
+    # px.scatter that keeps the figure small: past max_points rows it plots distinct points sized by
+    # their row count, or a 2-D density when those are still too many, and says so in the title
+    labels = dict(labels or {})
+    note = None
+    rows = int(data['rows'].sum()) if 'rows' in data else len(data)
+    if len(data) > max_points:
+        points = aggregate_points(data, x, y, color)
+        if len(points) > MAX_AGGREGATED_POINTS:
+            grid = density(data, x, y)
+            fig = px.imshow(grid, origin='lower', aspect='auto', color_continuous_scale='Viridis',
+                            labels={"x": labels.get(x, x), "y": labels.get(y, y), "color": "Rows"})
+            note = f"{rows:,} rows binned into a {grid.shape[1]} x {grid.shape[0]} density"
+            fig.update_layout(title=f"{title}<br><sup>{note}</sup>" if title else note)
+            return fig
+        note = f"{rows:,} rows shown as {len(points):,} distinct points, sized by row count"
+        data, size = points, 'rows'
+        labels.setdefault('rows', "Rows")
+        hover_data = dict(hover_data or {}, rows=True)
+
+    fig = px.scatter(data, x=x, y=y, color=color, size=size, labels=labels, hover_data=hover_data,
+                     render_mode='webgl' if len(data) >= WEBGL_POINTS else 'auto', **options)
+    if note:
+        title = f"{title}<br><sup>{note}</sup>" if title else note
+    fig.update_layout(title=title)
+    return fig
+
+
+def histogram(bins, title=None, x_label=None, y_label="Count", color=None):
+    # Bars for pre-binned counts (bin_start, bin_end, count), e.g. from analytics.common.histogram
+    fig = go.Figure(go.Bar(x=(bins['bin_start'] + bins['bin_end']) / 2, y=bins['count'],
+                           width=bins['bin_end'] - bins['bin_start'], marker_color=color,
+                           customdata=bins[['bin_start', 'bin_end']],
+                           hovertemplate="%{customdata[0]:.2f} - %{customdata[1]:.2f}: %{y:,}<extra></extra>"))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, bargap=0)
+    return fig
@@ -0,0 +1,609 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from profiling import phase
+
+try:
+    import snapshot
+except ImportError:  # pyarrow not installed, serve from the CSV only
+    snapshot = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, concurrent snapshot builds are not serialized there
+    fcntl = None
+
+DATA_PATH = "Cleaned_Coffee_Shop_Sales.csv"
+
+# Low-cardinality text columns, stored as categoricals / dictionary-encoded columns
+CATEGORY_COLUMNS = ['store_location', 'product_category', 'product_type', 'product_detail']
+
+# Width of the time_slot column's intraday buckets
+SLOT_MINUTES = 15
+
+# Columns prepare() derives, and the source columns each is derived from
+DERIVED_COLUMNS = {
+    'transaction_hour': ['transaction_time'],
+    'time_slot': ['transaction_time'],
+    'cost': ['average_cost', 'transaction_qty'],
+    'profit': ['total_sales', 'average_cost', 'transaction_qty'],
+}
+
+# Out-of-core mode: aggregates that support it are built by streaming the CSV in chunks of CHUNK_ROWS rows,
+# so the dataset never has to fit in memory
+OUT_OF_CORE = os.environ.get("DASHBOARD_OUT_OF_CORE") == "1"
+CHUNK_ROWS = int(os.environ.get("DASHBOARD_CHUNK_ROWS", 250_000))
+
+# Selections whose out-of-core distinct counts are kept, like analytics.common.MEMO_ENTRIES
+DISTINCT_ENTRIES = 64
+
+# Several dashboard processes on one host: the first to need the data writes the Arrow snapshot and every
+# process memory-maps it, so the operating system holds one read-only copy of the columns for all of them
+SHARED = os.environ.get("DASHBOARD_SHARED") == "1"
+
+# Bytes read at a time when hashing the file for its content fingerprint
+_HASH_BLOCK_BYTES = 1 << 20
+
+# Sizes per file whose hash state is kept, so appends are hashed from the last one
+HASH_STATES = 8
+
+logger = logging.getLogger(__name__)
+
+# Pages get shallow copies of one shared frame; copy-on-write keeps their edits private.
+# It is always on from pandas 3.0, earlier releases need it switched on.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+_lock = threading.RLock()
+_cache = {"files": None, "source": None, "columns": {}, "complete": False, "derived": {}, "order": None}
+_stat_fingerprints = {}
+_hash_lock = threading.Lock()
+_hash_states = {}
+_snapshot_sources = {}
+_stale_snapshots = set()
+_load_stats = {}
+_streamed = {}
+_stream_locks = {}
+_distinct_counts = OrderedDict()
+
+
+def snapshot_path(path):
+    return os.path.splitext(path)[0] + ".arrow"
+
+
+def _tail(f, size):
+    # Hash of the block just before `size`, which an append leaves in place
+    start = max(size - _HASH_BLOCK_BYTES, 0)
+    f.seek(start)
+    return hashlib.blake2b(f.read(size - start), digest_size=16).digest()
+
+
+def _digest(path, size):
+    # Hash of the first `size` bytes of the file. All of them: an edit anywhere, even one that keeps the size,
+    # gives a new fingerprint, and so a new dataset version and a stale snapshot. The hash state is kept at each
+    # size the file was hashed at. When the file has grown past the largest of them and the block before it is
+    # unchanged, the file is taken to have been appended to, and only the bytes after it are read.
+    with _hash_lock, open(path, "rb") as f:
+        states = _hash_states.setdefault(path, OrderedDict())
+        file_size = os.fstat(f.fileno()).st_size
+        known = max((k for k in states if k <= size), default=0)
+        if 0 < known < file_size and _tail(f, known) == states[known][1]:
+            start, digest = known, states[known][0].copy()
+        else:
+            start, digest = 0, hashlib.blake2b(digest_size=16)
+        f.seek(start)
+        remaining = size - start
+        while remaining > 0:
+            block = f.read(min(remaining, _HASH_BLOCK_BYTES))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        states[size] = (digest.copy(), _tail(f, size))
+        states.move_to_end(size)
+        while len(states) > HASH_STATES:
+            states.popitem(last=False)
+    return digest.hexdigest()
+
+
+def fingerprint(path):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    # Hashing is only redone when mtime or size move, so reruns just pay for a stat()
+    if key not in _stat_fingerprints:
+        for stale in [k for k in _stat_fingerprints if k[0] == path]:
+            del _stat_fingerprints[stale]
+        _stat_fingerprints[key] = _digest(path, stat.st_size)
+    return _stat_fingerprints[key]
+
+
+def prepare(data):
+    # Typed schema shared by the CSV path and the snapshot, rows in date order.
+    # Time of day is decoded once here into seconds since midnight, hour and 15-minute slot.
+    data['transaction_date'] = pd.to_datetime(data['transaction_date'])
+    if 'transaction_time' in data:
+        if not pd.api.types.is_integer_dtype(data['transaction_time']):
+            data['transaction_time'] = pd.to_timedelta(data['transaction_time']).dt.total_seconds().astype('int32')
+        data['transaction_hour'] = (data['transaction_time'] // 3600).astype('int8')
+        data['time_slot'] = (data['transaction_time'] // (SLOT_MINUTES * 60)).astype('int8')
+    # Cost and profit of each sales row, stored with the data so no page recomputes them
+    if 'average_cost' in data and 'transaction_qty' in data:
+        data['cost'] = data['average_cost'] * data['transaction_qty']
+        if 'total_sales' in data:
+            data['profit'] = data['total_sales'] - data['cost']
+    for column in CATEGORY_COLUMNS:
+        if column in data:
+            data[column] = data[column].astype('category')
+    return data.sort_values('transaction_date', kind='stable', ignore_index=True)
+
+
+def _source_columns(columns, keys=('transaction_date',)):
+    # CSV columns to parse for `columns`, with the source columns of derived ones, or None for all of them
+    if columns is None:
+        return None
+    return list(dict.fromkeys(list(keys) + [source for c in columns for source in DERIVED_COLUMNS.get(c, [c])]))
+
+
+def read_csv(path=DATA_PATH, offset=0, columns=None):
+    # With an offset, parse only the bytes appended after it, under the file's own header.
+    # With columns, parse only those (plus the date, which orders the rows).
+    usecols = _source_columns(columns)
+    if not offset:
+        return prepare(pd.read_csv(path, usecols=usecols))
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        return prepare(pd.read_csv(io.BytesIO(header + f.read()), usecols=usecols))
+
+
+def iter_chunks(path=DATA_PATH, columns=None, chunk_rows=None):
+    # Prepared chunks of the CSV. The rows of a chunk's last transaction are held back to start the next
+    # chunk, so a transaction (whose rows are contiguous in the file) is never split between two chunks.
+    usecols = _source_columns(columns, keys=('transaction_id', 'transaction_date'))
+    carry = None
+    for chunk in pd.read_csv(path, chunksize=chunk_rows or CHUNK_ROWS, usecols=usecols):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        ids = chunk['transaction_id'].to_numpy()
+        split = len(ids) - int(np.argmax(ids[::-1] != ids[-1]))
+        if split == len(ids):  # the whole chunk is one transaction
+            carry = chunk
+            continue
+        carry = chunk.iloc[split:]
+        yield prepare(chunk.iloc[:split].copy())
+    if carry is not None:
+        yield prepare(carry.copy())
+
+
+def _stream(name, build, merge, columns, path):
+    # One pass over the CSV: `build(chunk)` makes a compact partial result per chunk, `merge(partials)`
+    # combines them
+    start = time.perf_counter()
+    with phase(f"stream:{name}"):
+        partials = []
+        for chunk in iter_chunks(path, columns):
+            partials.append(build(chunk))
+            del chunk
+        result = merge(partials)
+    elapsed = time.perf_counter() - start
+    _load_stats.setdefault("streamed_seconds", {})[name] = elapsed
+    _load_stats.setdefault("streamed_chunks", {})[name] = len(partials)
+    logger.info("Streamed %s from %s in %d chunks, %.3fs", name, path, len(partials), elapsed)
+    return result
+
+
+def load_streamed(name, build, merge, columns=None, path=DATA_PATH):
+    # Out-of-core counterpart of load_derived. Only the merged result is kept, for as long as the CSV is
+    # unchanged. The scan holds a lock of its own, so sessions needing other data are not held up by it.
+    key = fingerprint(path)
+    entry = _streamed.get((name, path))
+    if entry is None or entry["key"] != key:
+        with _lock:
+            build_lock = _stream_locks.setdefault((name, path), threading.Lock())
+        with build_lock:
+            entry = _streamed.get((name, path))
+            if entry is None or entry["key"] != key:
+                entry = {"key": key, "result": _stream(name, build, merge, columns, path)}
+                _streamed[(name, path)] = entry
+    return entry["result"]
+
+
+def _snapshot_chain(path):
+    # The snapshot files and whether they were built from the current CSV
+    files = tuple((p, fingerprint(p), os.path.getsize(p)) for p in snapshot.snapshot_files(path))
+    latest = files[-1][:2]
+    if latest not in _snapshot_sources:
+        _snapshot_sources[latest] = snapshot.source_fingerprint(latest[0])
+    return files, not os.path.exists(path) or _snapshot_sources[latest] == fingerprint(path)
+
+
+@contextmanager
+def snapshot_lock(path):
+    # Held by everything that writes a CSV's snapshot chain (shared rebuilds, ingest's append and delta),
+    # so no rebuild can run between an append to the CSV and the delta that records it
+    with open(snapshot_path(path) + ".lock", "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _share_snapshot(path):
+    # Write the snapshot when it is missing or stale, and fold appended batches into it: the columns of a chain
+    # of files are private copies in every process, those of one file are shared. The first process to get the
+    # lock writes it, the others wait for it and then map the same file.
+    if os.path.exists(snapshot_path(path)):
+        files, current = _snapshot_chain(path)
+        if current and len(files) == 1:
+            return
+    with snapshot_lock(path):
+        if not os.path.exists(snapshot_path(path)) or not _snapshot_chain(path)[1]:
+            snapshot.write_snapshot(path)
+            logger.info("Wrote shared snapshot %s", snapshot_path(path))
+        elif len(_snapshot_chain(path)[0]) > 1:
+            snapshot.compact(path)
+            logger.info("Compacted shared snapshot %s", snapshot_path(path))
+
+
+def _resolve_source(path):
+    # Prefer the snapshot chain, unless it was built from a different version of the CSV
+    if SHARED and snapshot is not None and os.path.exists(path):
+        _share_snapshot(path)
+    if snapshot is not None and os.path.exists(snapshot_path(path)):
+        files, current = _snapshot_chain(path)
+        latest = files[-1][:2]
+        if current:
+            return "snapshot", files
+        if latest not in _stale_snapshots:
+            _stale_snapshots.add(latest)
+            logger.warning("Ignoring stale snapshot %s, rebuild it with `python snapshot.py`", snapshot_path(path))
+    return "csv", ((path, fingerprint(path), os.path.getsize(path)),)
+
+
+def _is_loaded(files, columns):
+    if _cache["files"] != files:
+        return False
+    if columns is None:
+        return _cache["complete"]
+    return all(c in _cache["columns"] for c in columns)
+
+
+def _is_compacted(source, files):
+    # Whether the snapshot chain was compacted into files since it was cached: the same rows of the same CSV
+    # version, in the date order they are cached in
+    old_files = _cache["files"]
+    if source != "snapshot" or _cache["source"] != source or not old_files or len(old_files) == 1 or len(files) > 1:
+        return False
+    old_version = _snapshot_sources.get(old_files[-1][:2])
+    return files[0][0] == old_files[0][0] and old_version is not None and old_version == _snapshot_sources.get(
+        files[0][:2])
+
+
+def _read_appended(source, files):
+    # Rows added since the cached version, or None when the source was rewritten rather than appended to
+    old_files = _cache["files"]
+    if _cache["source"] != source or not old_files or not _cache["columns"]:
+        return None
+    columns = list(_cache["columns"])
+    if source == "snapshot":
+        if files[:len(old_files)] != old_files:
+            return None
+        return snapshot.read_columns([f[0] for f in files[len(old_files):]], columns)
+
+    (path, _, size), = files
+    (old_path, old_fingerprint, old_size), = old_files
+    if path != old_path or size <= old_size or _digest(path, old_size) != old_fingerprint:
+        return None
+    return read_csv(path, offset=old_size, columns=columns)[columns]
+
+
+def _date_order(dates):
+    # Row permutation that sorts by date, or None when the rows are already in date order
+    if dates.is_monotonic_increasing:
+        return None
+    return np.argsort(dates.to_numpy(), kind='stable')
+
+
+def _take(series, order):
+    return series if order is None else series.take(order).reset_index(drop=True)
+
+
+def _concat(old, new):
+    if isinstance(old.dtype, pd.CategoricalDtype):
+        return pd.Series(union_categoricals([old, new], sort_categories=True), name=old.name)
+    return pd.concat([old, new], ignore_index=True)
+
+
+def _apply_appended(appended):
+    cached = _cache["columns"]
+    old_rows = len(cached['transaction_date'])
+    for column in cached:
+        cached[column] = _concat(cached[column], appended[column])
+
+    # Late rows (dates before the current end) are merged back into date order. _cache["order"] maps
+    # each row to its position in the snapshot chain, for columns that are mapped in later.
+    rows = len(cached['transaction_date'])
+    file_order = None if _cache["order"] is None else np.concatenate([_cache["order"], np.arange(old_rows, rows)])
+    order = _date_order(cached['transaction_date'])
+    if order is not None:
+        for column in cached:
+            cached[column] = _take(cached[column], order)
+        file_order = order if file_order is None else file_order[order]
+    _cache["order"] = file_order
+
+    # Derived results with an update hook absorb the new rows, the rest are rebuilt on demand
+    for name, entry in list(_cache["derived"].items()):
+        if entry["update"] is None:
+            del _cache["derived"][name]
+            continue
+        start = time.perf_counter()
+        data = pd.DataFrame({c: cached[c] for c in entry["columns"] or cached}, copy=False)
+        entry["result"] = entry["update"](entry["result"], appended, data)
+        _load_stats.setdefault("derived_seconds", {})[name] = time.perf_counter() - start
+
+
+def _ensure_loaded(path, columns):
+    try:
+        return _load(path, columns)
+    except FileNotFoundError:
+        if not os.path.exists(path) and not os.path.exists(snapshot_path(path)):
+            raise
+        # Another process compacted or rebuilt the snapshot chain while it was being read; resolve it again
+        return _load(path, columns)
+
+
+def _load(path, columns):
+    source, files = _resolve_source(path)
+    if _is_loaded(files, columns):
+        return _cache["columns"]
+
+    with _lock:
+        if _is_loaded(files, columns):
+            return _cache["columns"]
+        cached = _cache["columns"]
+
+        start = time.perf_counter()
+        if _cache["files"] != files:
+            compacted = _is_compacted(source, files)
+            appended = None if compacted else _read_appended(source, files)
+            if compacted:
+                # Map the cached columns from the one file, releasing their private copies; derived results hold
+                loaded = snapshot.read_columns([files[0][0]], list(cached))
+                cached.update(loaded.items())
+                _cache["order"] = None
+            elif appended is not None:
+                _apply_appended(appended)
+                _load_stats["appended_rows"] = _load_stats.get("appended_rows", 0) + len(appended)
+            else:
+                cached = {}
+                _cache.update({"source": source, "columns": cached, "complete": False, "derived": {}, "order": None})
+                _load_stats.update({"load_seconds": 0.0, "derived_seconds": {}, "appended_rows": 0})
+            _cache["files"] = files
+
+        if not _is_loaded(files, columns):
+            if source == "snapshot":
+                # Only the columns no page has asked for yet are mapped in; the date column always is,
+                # since the snapshot chain may need reordering into date order
+                missing = None if columns is None else [c for c in columns if c not in cached]
+                if missing is not None and 'transaction_date' not in cached and 'transaction_date' not in missing:
+                    missing.append('transaction_date')
+                loaded = snapshot.read_columns([f[0] for f in files], missing)
+                if not cached:
+                    _cache["order"] = _date_order(loaded['transaction_date'])
+                cached.update((c, _take(loaded[c], _cache["order"])) for c in loaded.columns)
+                _cache["complete"] = missing is None
+            else:
+                # Only the columns no page has asked for yet are parsed, in the same date order as the cached ones
+                missing = None if columns is None else [c for c in columns if c not in cached]
+                cached.update((c, v) for c, v in read_csv(files[0][0], columns=missing).items() if c not in cached)
+                _cache["complete"] = missing is None
+        elapsed = time.perf_counter() - start
+
+        frame = pd.DataFrame(cached, copy=False)
+        _load_stats.update({
+            "path": files[0][0],
+            "source": source,
+            "files": len(files),
+            "fingerprint": files[-1][1],
+            "rows": len(frame),
+            "columns_loaded": len(cached),
+            "load_seconds": _load_stats.get("load_seconds", 0.0) + elapsed,
+            "memory_bytes": int(frame.memory_usage(deep=True).sum()),
+            "loaded_at": time.time(),
+            "loads": _load_stats.get("loads", 0) + 1,
+        })
+        logger.info("Loaded %s from %s in %.3fs, %d columns resident (%.1f MB)", source, files[0][0], elapsed,
+                    len(cached), _load_stats["memory_bytes"] / 1e6)
+        return cached
+
+
+def load_data(columns=None, path=DATA_PATH):
+    with phase("load_data"):
+        cached = _ensure_loaded(path, columns)
+        columns = list(cached) if columns is None else columns
+
+        # Shallow copy: pages may add their own columns without touching the shared columns
+        data = pd.DataFrame({c: cached[c] for c in columns}, copy=False)
+    _load_stats["hits"] = _load_stats.get("hits", 0) + 1
+    return data
+
+
+def load_derived(name, build, columns=None, path=DATA_PATH, update=None):
+    # Results built from the dataset (rollups, indexes) live as long as the dataset version does.
+    # `update(result, appended_rows, data)` lets a result absorb appended rows instead of rebuilding.
+    _ensure_loaded(path, columns)
+    entry = _cache["derived"].get(name)
+    if entry is None:
+        with _lock:
+            entry = _cache["derived"].get(name)
+            if entry is None:
+                start = time.perf_counter()
+                with phase(f"build:{name}"):
+                    result = build(load_data(columns, path))
+                elapsed = time.perf_counter() - start
+                entry = {"result": result, "columns": columns, "update": update}
+                _cache["derived"][name] = entry
+                _load_stats.setdefault("derived_seconds", {})[name] = elapsed
+                logger.info("Built %s in %.3fs", name, elapsed)
+    return entry["result"]
+
+
+def build_date_index(data):
+    # Distinct dates and the row offset where each one starts, plus the end offset
+    dates = data['transaction_date'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]]) if len(dates) else np.array([], dtype=int)
+    return dates[starts], np.r_[starts, len(dates)]
+
+
+def date_bounds(path=DATA_PATH):
+    if OUT_OF_CORE:
+        return load_streamed('date_bounds',
+                             lambda chunk: (chunk['transaction_date'].min(), chunk['transaction_date'].max()),
+                             lambda partials: (min(p[0] for p in partials), max(p[1] for p in partials)),
+                             ['transaction_date'], path)
+    dates, _ = load_derived('date_index', build_date_index, ['transaction_date'], path)
+    return pd.Timestamp(dates[0]), pd.Timestamp(dates[-1])
+
+
+def date_positions(dates, start_date=None, end_date=None):
+    # Positions [lo, hi) of an inclusive date range in a sorted array of dates, by binary search
+    lo = 0 if start_date is None else dates.searchsorted(np.datetime64(pd.to_datetime(start_date)), 'left')
+    hi = len(dates) if end_date is None else dates.searchsorted(np.datetime64(pd.to_datetime(end_date)), 'right')
+    return lo, hi
+
+
+def load_date_range(start_date=None, end_date=None, columns=None, path=DATA_PATH):
+    # Rows are kept in date order, so a date range is one contiguous slice found by binary search
+    dates, offsets = load_derived('date_index', build_date_index, ['transaction_date'], path)
+    lo, hi = date_positions(dates, start_date, end_date)
+    return load_data(columns, path).iloc[offsets[lo]:offsets[hi]]
+
+
+def select_dates(table, start_date=None, end_date=None, filters=None):
+    # Rows of a date-ordered table (the data or a derived table) inside a date range and matching the dimension
+    # filters. The date range is a binary-searched slice taken before any mask is built.
+    lo, hi = date_positions(table['transaction_date'].to_numpy(), start_date, end_date)
+    table = table.iloc[lo:hi]
+    return table[member_mask(table, filters)] if filters else table
+
+
+def union_categories(frames, columns):
+    # Give each categorical column of the frames the union of their categories, so they concatenate as
+    # categoricals; used to merge the partial results of separate chunks
+    for column in columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([f[column] for f in frames], ignore_order=True).categories
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+    return frames
+
+
+def update_dates(table, appended, data, build, categorical, order, key='transaction_date'):
+    # Update hook of a derived table partitioned by date (or with key='year_month', by month): the partitions the
+    # appended rows fall into are rebuilt from just those rows of data, found by binary search in its date order,
+    # and the other partitions are kept.
+    dates = data['transaction_date'].to_numpy()
+    if key == 'year_month':
+        touched = appended['transaction_date'].dt.to_period('M').unique()
+        starts, ends = touched.start_time, touched.end_time.normalize()
+    else:
+        touched = appended['transaction_date'].unique()
+        starts = ends = pd.DatetimeIndex(touched)
+    lo = dates.searchsorted(starts.to_numpy().astype(dates.dtype), 'left')
+    hi = dates.searchsorted(ends.to_numpy().astype(dates.dtype), 'right')
+    rows = np.concatenate([np.arange(start, end) for start, end in zip(lo, hi)]) if len(lo) else []
+
+    kept = table[~table[key].isin(touched)]
+    for column in categorical:
+        if isinstance(kept[column].dtype, pd.CategoricalDtype):
+            kept[column] = kept[column].cat.set_categories(data[column].cat.categories)
+    rebuilt = build(data.iloc[rows])
+    return pd.concat([kept, rebuilt], ignore_index=True).sort_values(order, kind='stable', ignore_index=True)
+
+
+def member_mask(data, filters):
+    # Rows whose dimension columns match the filters; a filter value is a single member or a list of members
+    mask = np.ones(len(data), dtype=bool)
+    for column, value in filters.items():
+        if pd.api.types.is_list_like(value):
+            mask &= data[column].isin(value).to_numpy()
+        else:
+            mask &= (data[column] == value).to_numpy()
+    return mask
+
+
+def load_rows(columns, start_date=None, end_date=None, path=DATA_PATH, **filters):
+    # Rows in a date range that match the dimension filters, the row-level counterpart of sales_cube.filter_cube
+    rows = load_date_range(start_date, end_date, list(dict.fromkeys(list(columns) + list(filters))), path)
+    if filters:
+        rows = rows[member_mask(rows, filters)]
+    return rows[list(columns)]
+
+
+def count_distinct(column, start_date=None, end_date=None, path=DATA_PATH, **filters):
+    # Distinct values of a column in a selection. Out of core this is one scan of the CSV per selection:
+    # transactions are never split between chunks, so their per-chunk counts add up, while other columns
+    # merge the distinct values of each chunk. Callers with an aggregate that can answer the selection
+    # (sales_cube.count_distinct, the transaction sketches) use it instead; the last DISTINCT_ENTRIES
+    # scanned selections are kept.
+    if not OUT_OF_CORE:
+        return load_rows([column], start_date, end_date, path, **filters)[column].nunique()
+
+    def build(chunk):
+        dates = chunk['transaction_date']
+        mask = member_mask(chunk, filters)
+        if start_date is not None:
+            mask &= (dates >= pd.to_datetime(start_date)).to_numpy()
+        if end_date is not None:
+            mask &= (dates <= pd.to_datetime(end_date)).to_numpy()
+        values = chunk[column][mask]
+        return values.nunique() if column == 'transaction_id' else np.asarray(values.unique())
+
+    def merge(partials):
+        if column == 'transaction_id':
+            return int(sum(partials))
+        return len(pd.unique(np.concatenate(partials))) if partials else 0
+
+    key = (fingerprint(path), path, column, repr(start_date), repr(end_date), repr(sorted(filters.items())))
+    with _lock:
+        if key in _distinct_counts:
+            _distinct_counts.move_to_end(key)
+            return _distinct_counts[key]
+    count = _stream(f"count_distinct:{column}", build, merge,
+                    list(dict.fromkeys([column, 'transaction_date'] + list(filters))), path)
+    with _lock:
+        _distinct_counts[key] = count
+        while len(_distinct_counts) > DISTINCT_ENTRIES:
+            _distinct_counts.popitem(last=False)
+    return count
+
+
+def _result_bytes(result):
+    if isinstance(result, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = result.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, dict):
+        return sum(_result_bytes(value) for value in list(result.values()))
+    if isinstance(result, (tuple, list)):
+        return sum(_result_bytes(value) for value in result)
+    return 0
+
+
+def load_stats():
+    # Derived results (cube, indexes, memoized filter results) are shared by every session of the process,
+    # so their size grows with the distinct filter states asked for rather than with the number of users
+    stats = dict(_load_stats, shared=SHARED)
+    stats["derived_bytes"] = {name: _result_bytes(entry["result"]) for name, entry in list(_cache["derived"].items())}
+    return stats
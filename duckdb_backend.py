@@ -0,0 +1,180 @@
+import os
+import threading
+
+import duckdb
+import pandas as pd
+
+import data_loader
+from data_loader import DATA_PATH
+from profiling import phase
+from sales_cube import MEASURES, plan_columns, plan_results
+
+# Embedded DuckDB backend for the aggregate queries of query.py. It scans the memory-mapped Arrow snapshot
+# when there is a current one, else the CSV itself, and hands back the same frames as sales_cube.
+
+# Worker threads per query; 0 leaves it to DuckDB (one per core)
+THREADS = int(os.environ.get("DASHBOARD_DUCKDB_THREADS", 0))
+
+# Cube measures as SQL over the sales rows; sums of no rows are 0, as in pandas
+MEASURE_SQL = {
+    'total_sales': "COALESCE(SUM(total_sales), 0)",
+    'transaction_qty': "CAST(COALESCE(SUM(transaction_qty), 0) AS BIGINT)",
+    'cost': "COALESCE(SUM(average_cost * transaction_qty), 0)",
+    'profit': "COALESCE(SUM(total_sales - average_cost * transaction_qty), 0)",
+    'unit_price_sum': "COALESCE(SUM(unit_price), 0)",
+    'row_count': "COUNT(*)",
+}
+
+# Keys derived from the date, as in sales_cube.DERIVED_KEYS
+KEY_SQL = {
+    'year_month': "date_trunc('month', transaction_date)",
+    'month': "month(transaction_date)",
+    'day_of_week': "dayname(transaction_date)",
+}
+
+# What every query reads: the prepared sales rows, as a plain scan of the snapshot, or the CSV loaded once
+_SNAPSHOT_VIEW = """
+    SELECT * EXCLUDE (transaction_date, store_location, product_category, product_type, product_detail),
+           CAST(transaction_date AS DATE) AS transaction_date,
+           CAST(store_location AS VARCHAR) AS store_location,
+           CAST(product_category AS VARCHAR) AS product_category,
+           CAST(product_type AS VARCHAR) AS product_type,
+           CAST(product_detail AS VARCHAR) AS product_detail
+    FROM snapshot_rows
+"""
+
+_CSV_VIEW = """
+    SELECT * EXCLUDE (transaction_date, transaction_time),
+           CAST(transaction_date AS DATE) AS transaction_date,
+           hour(CAST(transaction_time AS TIME)) AS transaction_hour,
+           (hour(CAST(transaction_time AS TIME)) * 60 + minute(CAST(transaction_time AS TIME))) // {slot} AS time_slot
+    FROM read_csv({path}, header = true)
+"""
+
+_lock = threading.Lock()
+_connection = {"key": None, "connection": None, "rows": None}
+
+
+def _connect(path=DATA_PATH):
+    # One connection per version of the data, replaced when the CSV or its snapshot changes
+    source, files = data_loader._resolve_source(path)
+    key = (source, files)
+    with _lock:
+        if _connection["key"] != key:
+            connection = duckdb.connect()
+            if THREADS:
+                connection.execute(f"SET threads = {THREADS}")
+            if source == "snapshot":
+                import snapshot
+                rows = snapshot.read_table([file for file, _, _ in files])
+                connection.register("snapshot_rows", rows)
+                # Filters pushed into the Arrow scan are evaluated on the dictionary-encoded columns there,
+                # which made filtered queries several times slower than filtering in DuckDB
+                connection.execute("SET disabled_optimizers = 'filter_pushdown'")
+                connection.execute(f"CREATE VIEW sales AS {_SNAPSHOT_VIEW}")
+            else:
+                rows = None
+                quoted = "'" + path.replace("'", "''") + "'"
+                # Parsed into a DuckDB table once per version of the CSV; re-reading it per query costs more than
+                # the query. The snapshot (`python snapshot.py`) avoids holding this copy.
+                connection.execute(f"CREATE TABLE sales AS "
+                                   f"{_CSV_VIEW.format(path=quoted, slot=data_loader.SLOT_MINUTES)}")
+            _connection.update(key=key, connection=connection, rows=rows)
+        # A cursor per query, so sessions query concurrently; registered tables are per cursor
+        cursor = _connection["connection"].cursor()
+        if _connection["rows"] is not None:
+            cursor.register("snapshot_rows", _connection["rows"])
+        return cursor
+
+
+def _identifier(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _where(start_date, end_date, filters):
+    # Parameterized WHERE clause for a date range (inclusive) and dimension filters
+    clauses, parameters = [], []
+    if start_date is not None:
+        clauses.append("transaction_date >= ?")
+        parameters.append(pd.to_datetime(start_date).date())
+    if end_date is not None:
+        clauses.append("transaction_date <= ?")
+        parameters.append(pd.to_datetime(end_date).date())
+    for column, value in filters.items():
+        values = list(value) if pd.api.types.is_list_like(value) else [value]
+        if not values:
+            clauses.append("FALSE")
+            continue
+        clauses.append(f"{_identifier(column)} IN ({', '.join('?' * len(values))})")
+        parameters.extend(values)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", parameters
+
+
+def _key_sql(key):
+    return KEY_SQL.get(key, _identifier(key))
+
+
+def _query(sql, parameters):
+    with phase("duckdb"):
+        return _connect().execute(sql, parameters).df()
+
+
+def _keyed(frame, by):
+    # Key columns converted to the types sales_cube returns, then made the index
+    for key in by:
+        if key == 'year_month':
+            frame[key] = pd.to_datetime(frame[key]).dt.to_period('M')
+        elif key == 'transaction_date':
+            frame[key] = pd.to_datetime(frame[key])
+    return frame.set_index(by[0] if len(by) == 1 else by)
+
+
+def _grouped(by, columns, start_date, end_date, filters):
+    by = [by] if isinstance(by, str) else list(by)
+    where, parameters = _where(start_date, end_date, filters)
+    keys = ", ".join(f"{_key_sql(key)} AS {_identifier(key)}" for key in by)
+    measures = ", ".join(f"{MEASURE_SQL[m]} AS {m}" for m in columns)
+    positions = ", ".join(str(i + 1) for i in range(len(by)))
+    frame = _query(f"SELECT {keys}, {measures} FROM sales{where} GROUP BY {positions} ORDER BY {positions}",
+                   parameters)
+    return _keyed(frame, by)
+
+
+def rollup(by, start_date=None, end_date=None, **filters):
+    return _grouped(by, MEASURES, start_date, end_date, filters)
+
+
+def totals(start_date=None, end_date=None, **filters):
+    where, parameters = _where(start_date, end_date, filters)
+    measures = ", ".join(f"{MEASURE_SQL[m]} AS {m}" for m in MEASURES)
+    return _query(f"SELECT {measures} FROM sales{where}", parameters).iloc[0]
+
+
+def aggregate(plan, start_date=None, end_date=None, **filters):
+    # One GROUP BY per distinct key of the plan, each computing every measure that key needs
+    grouped = {by: _grouped(by, sorted(columns), start_date, end_date, filters)
+               for by, columns in plan_columns(plan).items()}
+    return plan_results(plan, grouped)
+
+
+def top_k(by, measure, n=10, ascending=False, start_date=None, end_date=None, **filters):
+    where, parameters = _where(start_date, end_date, filters)
+    order = "ASC" if ascending else "DESC"
+    frame = _query(f"SELECT {_key_sql(by)} AS {_identifier(by)}, {MEASURE_SQL[measure]} AS {measure} "
+                   f"FROM sales{where} GROUP BY 1 ORDER BY 2 {order}, 1 LIMIT {int(n)}", parameters)
+    return _keyed(frame, [by])[measure]
+
+
+def members(column, **filters):
+    # In order of first appearance once the rows are in date order, like data_loader.load_rows;
+    # the position of each row in the file breaks ties within a date
+    where, parameters = _where(None, None, filters)
+    frame = _query(f"SELECT {_identifier(column)} AS member "
+                   f"FROM (SELECT *, row_number() OVER () AS position FROM sales){where} GROUP BY 1 "
+                   f"ORDER BY MIN((transaction_date - DATE '1970-01-01') * 1000000000000 + position)", parameters)
+    return frame['member'].tolist()
+
+
+def count_distinct(column, start_date=None, end_date=None, **filters):
+    where, parameters = _where(start_date, end_date, filters)
+    return int(_query(f"SELECT COUNT(DISTINCT {_identifier(column)}) FROM sales{where}", parameters).iloc[0, 0])
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_loader import load_rows
+from profiling import phase
+
+# Two-sided confidence level of the elasticity intervals
+CONFIDENCE = 0.95
+
+# Fewest daily observations, and distinct prices among them, a product needs for a fit
+MIN_OBSERVATIONS = 3
+MIN_PRICE_POINTS = 2
+
+PRODUCT_KEYS = ['product_category', 'product_detail']
+
+
+def demand_observations(start_date=None, end_date=None, **filters):
+    # Units sold per product, day and price: the points each product's demand curve is fitted to
+    rows = load_rows(['transaction_date', 'unit_price', 'transaction_qty'] + PRODUCT_KEYS,
+                     start_date, end_date, **filters)
+    return rows.groupby(PRODUCT_KEYS + ['transaction_date', 'unit_price'], observed=True)[
+        'transaction_qty'].sum().reset_index()
+
+
+def _group_sums(groups, values, n_groups):
+    return np.bincount(groups, weights=values, minlength=n_groups)
+
+
+def fit_elasticities(observations, confidence=CONFIDENCE):
+    # Least-squares fit of log(units) = a + elasticity * log(price) for every product at once. Each sum the fit
+    # needs is one bincount over all observations, so the cost does not grow with the number of products.
+    with phase("elasticities"):
+        observations = observations[(observations['unit_price'] > 0) & (observations['transaction_qty'] > 0)]
+        by_product = observations.groupby(PRODUCT_KEYS, observed=True)
+        groups, products = by_product.ngroup().to_numpy(), by_product.size().index
+        n_groups = len(products)
+        price = observations['unit_price'].to_numpy(dtype=float)
+        units = observations['transaction_qty'].to_numpy(dtype=float)
+        x, y = np.log(price), np.log(units)
+
+        n = np.bincount(groups, minlength=n_groups).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Centred on each product's means before the cross products, for numerical stability
+            dx = x - (_group_sums(groups, x, n_groups) / n)[groups]
+            dy = y - (_group_sums(groups, y, n_groups) / n)[groups]
+            sxx = _group_sums(groups, dx * dx, n_groups)
+            sxy = _group_sums(groups, dx * dy, n_groups)
+            syy = _group_sums(groups, dy * dy, n_groups)
+            prices = pd.DataFrame({'group': groups, 'price': price})
+            price_points = np.bincount(prices.drop_duplicates()['group'], minlength=n_groups)
+            fitted = (n >= MIN_OBSERVATIONS) & (price_points >= MIN_PRICE_POINTS) & (sxx > 1e-12)
+            slope = np.where(fitted, sxy / sxx, np.nan)
+            residual = np.maximum(syy - slope * sxy, 0)
+            std_error = np.where(fitted, np.sqrt(residual / np.maximum(n - 2, 1) / sxx), np.nan)
+            t = stats.t.ppf((1 + confidence) / 2, np.maximum(n - 2, 1))
+
+        revenue = _group_sums(groups, price * units, n_groups)
+        total_units = _group_sums(groups, units, n_groups)
+        table = products.to_frame(index=False)
+        table['avg_price'] = revenue / np.where(total_units > 0, total_units, np.nan)
+        price_range = prices.groupby('group')['price'].agg(['min', 'max']).reindex(range(n_groups))
+        table['min_price'] = price_range['min'].to_numpy()
+        table['max_price'] = price_range['max'].to_numpy()
+        table['price_points'] = price_points
+        table['observations'] = n.astype(int)
+        table['units'] = total_units.astype(int)
+        table['elasticity'] = slope
+        table['std_error'] = std_error
+        table['ci_low'] = slope - t * std_error
+        table['ci_high'] = slope + t * std_error
+        return table
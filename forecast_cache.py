@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import phase
+
+# Fitted forecasts are kept on disk so they survive server restarts
+CACHE_DIR = ".forecast_cache"
+
+# Least recently used entries are evicted beyond this many, in memory and on disk
+MAX_ENTRIES = 256
+
+logger = logging.getLogger(__name__)
+
+# _lock guards _memory, _fitting and _stats; it is never held while a model is fitted
+_lock = threading.Lock()
+_memory = {}
+# Per key being read from disk or fitted, a lock held by the thread doing it, so a key is only fitted once
+_fitting = {}
+_stats = {"hits": 0, "disk_hits": 0, "misses": 0, "fit_seconds": 0.0}
+
+
+def series_key(series, order, steps):
+    # The key changes only when the series itself (dates or values), the order or the horizon does,
+    # so new data invalidates exactly the forecasts whose input it touched
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(series.index.values.astype('datetime64[ns]').view('int64')).tobytes())
+    digest.update(np.ascontiguousarray(series.to_numpy(dtype='float64')).tobytes())
+    digest.update(repr((tuple(order), steps)).encode())
+    return digest.hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key + ".pkl")
+
+
+def _read(key):
+    path = _entry_path(key)
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    # The file's mtime doubles as its last-use time for eviction
+    os.utime(path)
+    return result
+
+
+def _write(key, result):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _entry_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    _evict()
+
+
+def _evict():
+    entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith(".pkl")]
+    if len(entries) <= MAX_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime_ns)
+    for entry in entries[:len(entries) - MAX_ENTRIES]:
+        with _lock:
+            _memory.pop(entry.name[:-4], None)
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:  # already evicted by another process
+            pass
+
+
+def _cached(key):
+    # The in-memory result of a key, re-inserted to mark it most recently used; the caller holds _lock
+    result = _memory.pop(key, None)
+    if result is not None:
+        _memory[key] = result
+        _stats["hits"] += 1
+    return result
+
+
+def arima_forecast(series, order=(5, 1, 0), steps=30):
+    # Forecast `steps` days past the end of a daily series, fitting ARIMA only when no cached fit exists
+    key = series_key(series, order, steps)
+    with _lock:
+        result = _cached(key)
+        if result is not None:
+            return result
+        fitting = _fitting.setdefault(key, threading.Lock())
+
+    # Other keys are served and fitted meanwhile; callers of the same key wait here and then find it in memory
+    with fitting:
+        with _lock:
+            result = _cached(key)
+        if result is not None:
+            return result
+        try:
+            result = _read(key)
+            if result is not None:
+                with _lock:
+                    _stats["disk_hits"] += 1
+            else:
+                # statsmodels is only imported when a model actually has to be fitted
+                from statsmodels.tsa.arima.model import ARIMA
+
+                start = time.perf_counter()
+                with phase("arima_fit"):
+                    forecast = ARIMA(series.to_numpy(dtype='float64'), order=order).fit().forecast(steps=steps)
+                result = pd.Series(forecast, name='forecast', index=pd.date_range(
+                    series.index[-1] + pd.Timedelta(days=1), periods=steps, freq='D'))
+                elapsed = time.perf_counter() - start
+                with _lock:
+                    _stats["misses"] += 1
+                    _stats["fit_seconds"] += elapsed
+                logger.info("Fitted ARIMA%s on %d points in %.3fs", tuple(order), len(series), elapsed)
+                _write(key, result)
+            with _lock:
+                _memory[key] = result
+                while len(_memory) > MAX_ENTRIES:
+                    del _memory[next(iter(_memory))]
+        finally:
+            with _lock:
+                _fitting.pop(key, None)
+    return result
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,133 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import phase
+from sales_cube import rollup
+
+# Weekly seasonality of daily sales
+SEASON = 7
+
+
+def daily_matrix(by=('product_detail',), measure='transaction_qty'):
+    # One row per series and one column per day, days without sales as zeros
+    by = list(by)
+    daily = rollup(by + ['transaction_date'])[measure].unstack('transaction_date', fill_value=0)
+    dates = pd.date_range(daily.columns.min(), daily.columns.max(), freq='D')
+    daily = daily.reindex(columns=dates, fill_value=0)
+    return daily.index, dates, daily.to_numpy(dtype='float64')
+
+
+# Each method forecasts every row of a (series x days) array at once and returns a (series x steps) array
+
+def seasonal_naive(values, steps, season=SEASON):
+    # Repeat the last observed week
+    last = values[:, -season:]
+    return np.tile(last, (1, -(-steps // season)))[:, :steps]
+
+
+def moving_average(values, steps, window=4 * SEASON):
+    # Flat forecast at the mean of the trailing window, like the inventory page's monthly moving average
+    return np.repeat(values[:, -window:].mean(axis=1, keepdims=True), steps, axis=1)
+
+
+def holt_winters(values, steps, alpha=0.3, beta=0.05, gamma=0.2, season=SEASON):
+    # Additive Holt-Winters with a weekly season. The recursion runs over days; each step updates all series.
+    n_series, n_days = values.shape
+    if n_days < 2 * season:
+        return moving_average(values, steps, window=n_days)
+    level = values[:, :season].mean(axis=1)
+    trend = (values[:, season:2 * season].mean(axis=1) - level) / season
+    seasonal = values[:, :season] - level[:, None]
+    for t in range(n_days):
+        s = t % season
+        previous_level = level
+        level = alpha * (values[:, t] - seasonal[:, s]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonal[:, s] = gamma * (values[:, t] - level) + (1 - gamma) * seasonal[:, s]
+    horizon = np.arange(1, steps + 1)
+    season_index = (n_days + horizon - 1) % season
+    return level[:, None] + trend[:, None] * horizon + seasonal[:, season_index]
+
+
+def exponential_smoothing(values, steps, alpha=0.3):
+    # Simple exponential smoothing: Holt-Winters without trend or season
+    level = values[:, 0].copy()
+    for t in range(1, values.shape[1]):
+        level = alpha * values[:, t] + (1 - alpha) * level
+    return np.repeat(level[:, None], steps, axis=1)
+
+
+def arima(values, steps, order=(5, 1, 0)):
+    # The existing per-series statsmodels path, one fit per row, as the accuracy and runtime baseline
+    from batch_forecast import fit_series
+
+    dates = pd.date_range("2000-01-01", periods=values.shape[1], freq='D')
+    return np.vstack([fit_series(((i,), pd.Series(row, index=dates), tuple(order), steps))["forecast"]
+                      for i, row in enumerate(values)])
+
+
+# Forecasting methods by name; add an entry to make a method available to the page and the backtest
+METHODS = {
+    'ARIMA (5,1,0)': arima,
+    'Holt-Winters (weekly)': holt_winters,
+    'Seasonal naive (weekly)': seasonal_naive,
+    'Moving average (4 weeks)': moving_average,
+    'Exponential smoothing': exponential_smoothing,
+}
+
+# Methods that fit per series and scale with the number of series
+PER_SERIES_METHODS = {'ARIMA (5,1,0)'}
+
+
+def forecast(method, by=('product_detail',), measure='transaction_qty', steps=30):
+    # Forecasts for every series, one row per series and one column per forecast day
+    with phase(f"forecast:{method}"):
+        keys, dates, values = daily_matrix(by, measure)
+        forecasts = np.clip(METHODS[method](values, steps), 0, None)
+    return pd.DataFrame(forecasts, index=keys,
+                        columns=pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=steps, freq='D'))
+
+
+def backtest(by=('product_detail',), measure='transaction_qty', holdout=4 * SEASON, methods=None):
+    # Fit every method on all but the last `holdout` days and score it on those days
+    _, _, values = daily_matrix(by, measure)
+    train, actual = values[:, :-holdout], values[:, -holdout:]
+    rows = []
+    for name in methods or METHODS:
+        start = time.perf_counter()
+        predicted = np.clip(METHODS[name](train, holdout), 0, None)
+        elapsed = time.perf_counter() - start
+        error = predicted - actual
+        rows.append({
+            'method': name,
+            'series': len(values),
+            'seconds': elapsed,
+            'mae': np.abs(error).mean(),
+            'rmse': np.sqrt((error ** 2).mean()),
+            # Weighted absolute percentage error, which stays defined for days with zero sales
+            'wape': np.abs(error).sum() / max(np.abs(actual).sum(), 1e-9),
+        })
+    return pd.DataFrame(rows).set_index('method')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the vectorized forecasting methods against ARIMA(5,1,0).")
+    parser.add_argument("--by", nargs="+", default=['product_detail'],
+                        help="Columns identifying a series, e.g. --by store_location product_detail")
+    parser.add_argument("--measure", default='transaction_qty', choices=['transaction_qty', 'total_sales'])
+    parser.add_argument("--holdout", type=int, default=4 * SEASON, help="Days held out for scoring")
+    parser.add_argument("--no-arima", action="store_true", help="Skip the per-series ARIMA baseline")
+    args = parser.parse_args()
+
+    methods = [m for m in METHODS if not (args.no_arima and m in PER_SERIES_METHODS)]
+    results = backtest(args.by, args.measure, args.holdout, methods)
+    print(f"Backtest over the last {args.holdout} days, {int(results['series'].iloc[0])} series "
+          f"by {', '.join(args.by)}\n")
+    print(results.drop(columns='series').sort_values('wape').to_string(float_format=lambda x: f"{x:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+import data_loader
+
+try:
+    import snapshot
+except ImportError:  # pyarrow not installed, only the CSV is appended to
+    snapshot = None
+
+# Numeric columns of the schema; identifiers and quantities must also be whole numbers
+NUMERIC_COLUMNS = ['transaction_id', 'transaction_qty', 'store_id', 'product_id', 'unit_price', 'total_sales',
+                   'average_cost']
+INTEGER_COLUMNS = ['transaction_id', 'transaction_qty', 'store_id', 'product_id']
+
+# Largest allowed gap between total_sales and transaction_qty * unit_price
+SALES_TOLERANCE = 0.01
+
+
+def validate_batch(batch, columns):
+    # Check a raw batch against the stored schema and return it typed like the loaded dataset
+    missing = [c for c in columns if c not in batch.columns]
+    if missing:
+        raise ValueError(f"Batch is missing columns: {', '.join(missing)}")
+    if batch.empty:
+        raise ValueError("Batch has no rows")
+    batch = batch[columns]
+
+    problems = []
+    numeric = [c for c in NUMERIC_COLUMNS if c in columns]
+    numbers = batch[numeric].apply(pd.to_numeric, errors='coerce')
+    for column in numeric:
+        values = numbers[column]
+        if values.isna().any():
+            problems.append(f"{values.isna().sum()} empty or non-numeric values in {column}")
+        if (values < 0).any():
+            problems.append(f"{(values < 0).sum()} negative values in {column}")
+        fractional = values.notna() & (values % 1 != 0)
+        if column in INTEGER_COLUMNS and fractional.any():
+            problems.append(f"{fractional.sum()} non-integer values in {column}")
+    if (numbers['transaction_qty'] == 0).any():
+        problems.append("transaction_qty must be positive")
+    mismatch = (numbers['total_sales'] - numbers['transaction_qty'] * numbers['unit_price']).abs() > SALES_TOLERANCE
+    if mismatch.any():
+        problems.append(f"{mismatch.sum()} rows where total_sales != transaction_qty * unit_price")
+    if problems:
+        raise ValueError("Invalid batch: " + "; ".join(problems))
+
+    # Round-trip through the CSV parser so column dtypes come out as they do when loading the dataset
+    typed = pd.read_csv(io.StringIO(batch.to_csv(index=False)))
+    # Checked after parsing, so strings the parser reads as missing ("NA", "null", "") are caught too
+    nulls = typed.isna().sum()
+    if nulls.any():
+        raise ValueError("Invalid batch: " + "; ".join(f"{count} empty values in {column}"
+                                                         for column, count in nulls[nulls > 0].items()))
+    try:
+        typed = data_loader.prepare(typed)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid batch: unparseable date or time ({e})") from e
+    if not typed['transaction_time'].between(0, 24 * 3600 - 1).all():
+        raise ValueError("Invalid batch: transaction_time outside 00:00:00-23:59:59")
+    return typed
+
+
+def append_batch(batch, path=data_loader.DATA_PATH):
+    # Append validated rows to the CSV (and the snapshot chain, when it is current).
+    # Running dashboards detect the append and refresh only the dates it touches.
+    columns = pd.read_csv(path, nrows=0).columns.tolist()
+    typed = validate_batch(batch, columns)
+
+    with data_loader.snapshot_lock(path):
+        snapshot_current = (snapshot is not None and os.path.exists(data_loader.snapshot_path(path)) and
+                            snapshot.source_fingerprint(snapshot.snapshot_files(path)[-1]) ==
+                            data_loader.fingerprint(path))
+
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        batch[columns].to_csv(path, mode="a", header=False, index=False)
+
+        if snapshot_current:
+            snapshot.write_delta(typed, path)
+    return typed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a batch of new transactions and append it to the dataset.")
+    parser.add_argument("batch_path", help="CSV with the same columns as the dataset")
+    parser.add_argument("--data", default=data_loader.DATA_PATH, help="Dataset CSV to append to")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    batch = pd.read_csv(args.batch_path, dtype=str)
+    try:
+        typed = append_batch(batch, args.data)
+    except ValueError as e:
+        sys.exit(str(e))
+    dates = typed['transaction_date']
+    print(f"Appended {len(typed)} rows covering {dates.nunique()} dates "
+          f"({dates.min():%Y-%m-%d} to {dates.max():%Y-%m-%d}) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
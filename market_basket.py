@@ -0,0 +1,123 @@
+import argparse
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data_loader import load_rows
+from profiling import phase
+
+# Share of transactions an itemset must appear in to count as frequent
+MIN_SUPPORT = 0.005
+
+MIN_CONFIDENCE = 0.1
+
+# Largest itemset searched for
+MAX_ITEMSET_SIZE = 3
+
+
+def basket_matrix(start_date=None, end_date=None, item='product_detail', **filters):
+    # Transactions x items as a sparse 0/1 CSR matrix, with the item labels of its columns.
+    # Only the (transaction, item) pairs that occur are stored, so memory follows the number of sales rows.
+    with phase("basket_matrix"):
+        rows = load_rows(['transaction_id', item], start_date, end_date, **filters)
+        transactions, _ = pd.factorize(rows['transaction_id'])
+        items, labels = pd.factorize(rows[item])
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (transactions, items)),
+                                   shape=(transactions.max() + 1 if len(rows) else 0, len(labels)))
+        matrix.data[:] = 1  # an item rung up twice on a ticket is still one item in the basket
+        return matrix, pd.Index(labels, name=item)
+
+
+def frequent_itemsets(matrix, labels, min_support=MIN_SUPPORT, max_size=MAX_ITEMSET_SIZE):
+    # Apriori, level by level: the transactions holding an itemset are one sparse column, and one sparse
+    # product with the candidate item columns counts every extension of it at once
+    transactions = matrix.shape[0]
+    if not transactions:
+        return pd.DataFrame(columns=['itemset', 'size', 'support', 'transactions'])
+    min_count = max(int(np.ceil(min_support * transactions)), 1)
+    with phase("frequent_itemsets"):
+        counts = np.asarray(matrix.sum(axis=0)).ravel()
+        frequent_items = np.flatnonzero(counts >= min_count)
+        columns = matrix.tocsc()
+        found = {(i,): counts[i] for i in frequent_items}
+        level = {itemset: columns[:, itemset[0]] for itemset in found}
+        for _ in range(max_size - 1):
+            next_level = {}
+            for itemset, holders in level.items():
+                candidates = frequent_items[frequent_items > itemset[-1]]
+                # Every subset of a frequent itemset is frequent, so only extend by items that pass with each member
+                candidates = [c for c in candidates
+                              if all(tuple(sorted(subset + (c,))) in found
+                                     for subset in combinations(itemset, len(itemset) - 1))]
+                if not candidates:
+                    continue
+                extension_counts = np.asarray((holders.T @ columns[:, candidates]).todense()).ravel()
+                for candidate, count in zip(candidates, extension_counts):
+                    if count >= min_count:
+                        extended = itemset + (candidate,)
+                        found[extended] = count
+                        next_level[extended] = holders.multiply(columns[:, candidate]).tocsc()
+            if not next_level:
+                break
+            level = next_level
+
+    itemsets = pd.DataFrame({
+        'itemset': [tuple(labels[i] for i in itemset) for itemset in found],
+        'size': [len(itemset) for itemset in found],
+        'transactions': list(found.values()),
+    })
+    itemsets['support'] = itemsets['transactions'] / transactions
+    return itemsets.sort_values(['size', 'support'], ascending=[True, False], ignore_index=True)
+
+
+def association_rules(itemsets, min_confidence=MIN_CONFIDENCE):
+    # Antecedent -> consequent rules from every split of the frequent itemsets, with support, confidence and lift
+    support = dict(zip(itemsets['itemset'].map(frozenset), itemsets['support']))
+    rules = []
+    for itemset, itemset_support in zip(itemsets['itemset'], itemsets['support']):
+        for size in range(1, len(itemset)):
+            for antecedent in combinations(itemset, size):
+                consequent = tuple(i for i in itemset if i not in antecedent)
+                confidence = itemset_support / support[frozenset(antecedent)]
+                if confidence >= min_confidence:
+                    rules.append((antecedent, consequent, itemset_support, confidence,
+                                  confidence / support[frozenset(consequent)]))
+    rules = pd.DataFrame(rules, columns=['antecedent', 'consequent', 'support', 'confidence', 'lift'])
+    return rules.sort_values(['lift', 'confidence'], ascending=False, ignore_index=True)
+
+
+def top_pairs(matrix, labels, n=10):
+    # Items bought together most often, from the item co-occurrence counts (upper triangle of X'X)
+    co_occurrence = sparse.triu(matrix.T @ matrix, k=1).tocoo()
+    order = np.argsort(-co_occurrence.data, kind='stable')[:n]
+    transactions = max(matrix.shape[0], 1)
+    return pd.DataFrame({
+        'item_a': labels[co_occurrence.row[order]],
+        'item_b': labels[co_occurrence.col[order]],
+        'transactions': co_occurrence.data[order],
+        'support': co_occurrence.data[order] / transactions,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frequent itemsets and association rules of the sales baskets.")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--store", help="Only transactions of this store")
+    parser.add_argument("--min-support", type=float, default=MIN_SUPPORT)
+    parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE)
+    parser.add_argument("--max-size", type=int, default=MAX_ITEMSET_SIZE)
+    args = parser.parse_args()
+
+    filters = {'store_location': args.store} if args.store else {}
+    matrix, labels = basket_matrix(args.start_date, args.end_date, **filters)
+    itemsets = frequent_itemsets(matrix, labels, args.min_support, args.max_size)
+    print(f"{matrix.shape[0]:,} transactions, {matrix.shape[1]} items, {len(itemsets)} frequent itemsets")
+    print(top_pairs(matrix, labels).to_string())
+    print(association_rules(itemsets, args.min_confidence).head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
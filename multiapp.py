@@ -1,12 +1,94 @@
+import glob
+import importlib
+import logging
+import os
+import subprocess
+import sys
+import time
+
 import streamlit as st
 
+import profiling
+
+logger = logging.getLogger(__name__)
+
+# Page functions resolved so far and the seconds each page's import took, kept across reruns
+_loaded_pages = {}
+_import_times = {}
+
+
+# Show the developer panel in the sidebar, also switched on per browser tab with ?dev=1
+DEVELOPER_PANEL = os.environ.get("DASHBOARD_DEV", "") not in ("", "0")
+
+
+def import_report():
+    # Per-page startup cost, in the order the pages were first opened
+    return dict(_import_times)
+
+
 class MultiApp:
     def __init__(self):
         self.apps = []
 
-    def add_app(self, title, func):
-        self.apps.append({"title": title, "function": func})
+    def add_app(self, title, func=None, factory=None):
+        # `func` is either the page function or a module path ("apps.home", or "apps.home:app");
+        # a module path, like a `factory` returning the page function, is only resolved when the page is opened
+        self.apps.append({"title": title, "function": func, "factory": factory})
+
+    def _load(self, app):
+        if callable(app["function"]):
+            return app["function"]
+        if app["title"] not in _loaded_pages:
+            start = time.perf_counter()
+            if app["factory"] is not None:
+                function = app["factory"]()
+            else:
+                module_path, _, name = app["function"].partition(":")
+                function = getattr(importlib.import_module(module_path), name or "app")
+            _import_times[app["title"]] = time.perf_counter() - start
+            _loaded_pages[app["title"]] = function
+            logger.info("Imported page %s in %.3fs", app["title"], _import_times[app["title"]])
+        return _loaded_pages[app["title"]]
 
     def run(self):
         app = st.sidebar.radio("Navigate to:", self.apps, format_func=lambda app: app["title"])
-        app["function"]()
+        with profiling.page_run(app["title"]) as record:
+            with profiling.phase("import"):
+                page = self._load(app)
+            record["module"] = page.__module__
+            page()
+        if DEVELOPER_PANEL or st.query_params.get("dev") == "1":
+            _developer_panel(record)
+
+
+def _developer_panel(record):
+    from data_loader import load_stats
+
+    with st.sidebar.expander("Developer", expanded=True):
+        st.write(f"**{record['page']}** ran in {record['seconds']:.3f}s "
+                 f"({record['unattributed_seconds']:.3f}s outside named phases)")
+        st.dataframe([{"phase": name, "seconds": round(p["seconds"], 4), "calls": p["calls"]}
+                      for name, p in sorted(record["phases"].items(), key=lambda item: -item[1]["seconds"])],
+                     hide_index=True)
+        st.write("Recent runs by page")
+        st.dataframe([{"page": page, **{k: round(v, 4) for k, v in row.items()}}
+                      for page, row in profiling.summary().items()], hide_index=True)
+        st.write("Page import times")
+        st.json({title: round(seconds, 4) for title, seconds in import_report().items()}, expanded=False)
+        st.write("Dataset")
+        st.json(load_stats(), expanded=False)
+
+
+def main():
+    # Cold import cost of each page, measured in a fresh interpreter so shared imports are not hidden
+    pages = sys.argv[1:] or sorted("apps." + os.path.basename(p)[:-3] for p in glob.glob("apps/*.py"))
+    timer = "import importlib, time; start = time.perf_counter(); importlib.import_module({!r}); " \
+            "print(time.perf_counter() - start)"
+    for page in pages:
+        result = subprocess.run([sys.executable, "-c", timer.format(page)], capture_output=True, text=True)
+        cost = f"{float(result.stdout):7.3f}s" if result.returncode == 0 else "  failed"
+        print(f"{cost}  {page}")
+
+
+if __name__ == "__main__":
+    main()
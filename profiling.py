@@ -0,0 +1,101 @@
+import collections
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+
+# JSON-lines file that page run records are appended to; profiling records are kept in memory only when unset
+PROFILE_PATH = os.environ.get("DASHBOARD_PROFILE")
+
+# Most recent runs kept in memory for the developer panel
+RECENT_RUNS = 200
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_recent = collections.deque(maxlen=RECENT_RUNS)
+
+
+@contextlib.contextmanager
+def phase(name):
+    # Time a named phase of the current page run. Nested phases are recorded as "outer/inner";
+    # repeated phases add up. Outside a page run (scripts, batch jobs) this does nothing.
+    record = getattr(_local, "record", None)
+    if record is None:
+        yield
+        return
+    path = "/".join(_local.stack + [name])
+    _local.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _local.stack.pop()
+        entry = record["phases"].setdefault(path, {"seconds": 0.0, "calls": 0})
+        entry["seconds"] += elapsed
+        entry["calls"] += 1
+
+
+def widget_state(prefix=""):
+    # Values of keyed widgets under a prefix, as JSON-safe values. Pages key their widgets
+    # "<module>.<name>", since widgets of the previously shown page stay in session state until the run ends.
+    import streamlit as st
+
+    return {key[len(prefix):]: value if isinstance(value, (bool, int, float, str, type(None))) else str(value)
+            for key, value in sorted(st.session_state.to_dict().items())
+            if isinstance(key, str) and key.startswith(prefix)}
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+@contextlib.contextmanager
+def page_run(page, module=None):
+    # Time one run of a page with the phases inside it, then store and log the record.
+    # `module` (the page's module name, or set on the record once known) selects the widgets recorded.
+    record = {"page": page, "module": module, "phases": {}}
+    _local.record, _local.stack = record, []
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _local.record = None
+        record["seconds"] = time.perf_counter() - start
+        top_level = sum(p["seconds"] for name, p in record["phases"].items() if "/" not in name)
+        # Page code outside any named phase, including building and sending charts
+        record["unattributed_seconds"] = max(record["seconds"] - top_level, 0.0)
+        record["time"] = datetime.datetime.now().isoformat(timespec="milliseconds")
+        record["session"] = _session_id()
+        record["widgets"] = widget_state(record["module"].rsplit(".", 1)[-1] + ".") if record["module"] else {}
+        _recent.append(record)
+        if PROFILE_PATH:
+            line = json.dumps(record, default=str)
+            with _write_lock, open(PROFILE_PATH, "a") as f:
+                f.write(line + "\n")
+
+
+def recent_runs(page=None):
+    return [r for r in _recent if page is None or r["page"] == page]
+
+
+def summary():
+    # Run count, mean, p95 and worst run time per page over the recent runs
+    by_page = collections.defaultdict(list)
+    for record in list(_recent):
+        by_page[record["page"]].append(record["seconds"])
+    rows = {}
+    for page, seconds in by_page.items():
+        seconds = sorted(seconds)
+        rows[page] = {"runs": len(seconds), "mean_seconds": sum(seconds) / len(seconds),
+                      "p95_seconds": seconds[min(int(len(seconds) * 0.95), len(seconds) - 1)],
+                      "max_seconds": seconds[-1]}
+    return rows
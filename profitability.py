@@ -0,0 +1,98 @@
+import pandas as pd
+
+import data_loader
+import query
+from data_loader import load_derived, load_rows, load_streamed, member_mask, union_categories, update_dates
+from profiling import phase
+
+# Grain of the profit rollup: one row per month, store and product. Far coarser than the sales cube (no date
+# or hour), so profit by category, type or product, per store or per month, is a lookup in a small table.
+DIMENSIONS = ['year_month', 'store_location', 'product_category', 'product_type', 'product_detail']
+
+MEASURES = ['total_sales', 'transaction_qty', 'cost', 'profit']
+
+SOURCE_COLUMNS = ['transaction_date', 'store_location', 'product_category', 'product_type', 'product_detail',
+                  'total_sales', 'transaction_qty', 'cost', 'profit']
+
+# Every distinct average cost each product has been sold at: a handful of rows however long the history
+UNIT_COST_COLUMNS = ['product_category', 'product_type', 'product_detail', 'average_cost']
+
+
+def build_profit_rollup(data):
+    rows = data[SOURCE_COLUMNS[1:]].assign(year_month=data['transaction_date'].dt.to_period('M'))
+    return rows.groupby(DIMENSIONS, observed=True)[MEASURES].sum().reset_index()
+
+
+def update_profit_rollup(table, appended, data):
+    # Rebuild only the months the appended rows fall into
+    return update_dates(table, appended, data, build_profit_rollup, DIMENSIONS[1:], 'year_month', key='year_month')
+
+
+def merge_profit_rollups(partials):
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(union_categories(partials, DIMENSIONS[1:]), ignore_index=True).groupby(
+        DIMENSIONS, observed=True)[MEASURES].sum().reset_index()
+
+
+def load_profit_rollup():
+    if data_loader.OUT_OF_CORE:
+        return load_streamed('profit_rollup', build_profit_rollup, merge_profit_rollups, SOURCE_COLUMNS)
+    return load_derived('profit_rollup', build_profit_rollup, SOURCE_COLUMNS, update=update_profit_rollup)
+
+
+def _whole_months(start_date, end_date):
+    # Whether a date range starts and ends on month boundaries, so the monthly rollup can answer it exactly
+    return ((start_date is None or pd.to_datetime(start_date).is_month_start) and
+            (end_date is None or pd.to_datetime(end_date).is_month_end))
+
+
+def profit_rollup(by, start_date=None, end_date=None, **filters):
+    # Sales, units, cost, profit and margin (%) by any of DIMENSIONS. A date range that cuts through a month
+    # is answered from the sales cube instead, which holds the same measures per day.
+    by = [by] if isinstance(by, str) else list(by)
+    with phase("profit_rollup"):
+        if _whole_months(start_date, end_date) and all(c in DIMENSIONS for c in by + list(filters)):
+            table = load_profit_rollup()
+            if start_date is not None:
+                table = table[table['year_month'] >= pd.Period(pd.to_datetime(start_date), 'M')]
+            if end_date is not None:
+                table = table[table['year_month'] <= pd.Period(pd.to_datetime(end_date), 'M')]
+            if filters:
+                table = table[member_mask(table, filters)]
+            profit = table.groupby(by, observed=True)[MEASURES].sum()
+        else:
+            profit = query.rollup(by, start_date, end_date, **filters)[MEASURES]
+        profit['profit_margin'] = profit['profit'] / profit['total_sales'] * 100
+        return profit
+
+
+def build_unit_costs(data):
+    return data[UNIT_COST_COLUMNS].drop_duplicates(ignore_index=True)
+
+
+def merge_unit_costs(partials):
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(union_categories(partials, UNIT_COST_COLUMNS[:-1]), ignore_index=True).drop_duplicates(
+        ignore_index=True)
+
+
+def update_unit_costs(table, appended, data):
+    return merge_unit_costs([table.copy(), build_unit_costs(appended)])
+
+
+def load_unit_costs():
+    if data_loader.OUT_OF_CORE:
+        return load_streamed('unit_costs', build_unit_costs, merge_unit_costs, UNIT_COST_COLUMNS)
+    return load_derived('unit_costs', build_unit_costs, UNIT_COST_COLUMNS, update=update_unit_costs)
+
+
+def unit_costs(start_date=None, end_date=None, **filters):
+    # The average costs recorded for a selection's products, exactly as in the data. Only a date range or a
+    # filter the table does not hold (such as the store) needs the sales rows.
+    with phase("unit_costs"):
+        if start_date is None and end_date is None and all(c in UNIT_COST_COLUMNS[:-1] for c in filters):
+            table = load_unit_costs()
+            return table[member_mask(table, filters)] if filters else table
+        return load_rows(UNIT_COST_COLUMNS, start_date, end_date, **filters).drop_duplicates(ignore_index=True)
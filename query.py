@@ -0,0 +1,174 @@
+import argparse
+import importlib
+import inspect
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Modules answering the dashboard's aggregate queries. Each provides rollup, totals, aggregate, top_k, members
+# and count_distinct, taking the same arguments and returning the same results.
+BACKENDS = {'pandas': 'sales_cube', 'duckdb': 'duckdb_backend'}
+
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "pandas")
+
+# Analytics modules whose results must not depend on the backend
+PARITY_PAGES = ['home', 'sales_overview', 'product_analysis', 'customer_behavior', 'location_performance',
+                'profitability_analysis', 'inventory_stock_analysis', 'customer_insights_and_loyalty',
+                'pricing_demand_analysis', 'forecasting_predictive_analysis', 'marketing_insights']
+
+# Relative difference tolerated between backends; floating sums may be added up in another order
+PARITY_RTOL = 1e-9
+
+
+def backend(name=None):
+    name = name or BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown query backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    return importlib.import_module(BACKENDS[name])
+
+
+def rollup(by, start_date=None, end_date=None, **filters):
+    # Measures summed by one or more dimensions or derived date keys
+    return backend().rollup(by, start_date, end_date, **filters)
+
+
+def totals(start_date=None, end_date=None, **filters):
+    return backend().totals(start_date, end_date, **filters)
+
+
+def aggregate(plan, start_date=None, end_date=None, **filters):
+    # Named (by, measure, how) aggregates of one selection, see sales_cube.aggregate
+    return backend().aggregate(plan, start_date, end_date, **filters)
+
+
+def top_k(by, measure, n=10, ascending=False, start_date=None, end_date=None, **filters):
+    return backend().top_k(by, measure, n, ascending, start_date, end_date, **filters)
+
+
+def members(column, **filters):
+    return backend().members(column, **filters)
+
+
+def count_distinct(column, start_date=None, end_date=None, **filters):
+    return backend().count_distinct(column, start_date, end_date, **filters)
+
+
+def _plain_index(index):
+    if isinstance(index, pd.MultiIndex):
+        return pd.MultiIndex.from_arrays([_plain_index(index.get_level_values(i)) for i in range(index.nlevels)],
+                                         names=index.names)
+    return index.astype(object) if isinstance(index.dtype, pd.CategoricalDtype) else index
+
+
+def _plain(result):
+    # Results with categoricals turned into plain values, so backends are compared on values only
+    if isinstance(result, dict):
+        return {key: _plain(value) for key, value in result.items()}
+    if isinstance(result, (pd.Series, pd.DataFrame)):
+        result = result.copy()
+        result.index = _plain_index(result.index)
+        if isinstance(result, pd.DataFrame):
+            result.columns = _plain_index(result.columns)
+            for column in result.columns:
+                if isinstance(result[column].dtype, pd.CategoricalDtype):
+                    result[column] = result[column].astype(object)
+        elif isinstance(result.dtype, pd.CategoricalDtype):
+            result = result.astype(object)
+    return result
+
+
+def _difference(expected, actual):
+    # None when two results agree, else a short description of the first difference
+    expected, actual = _plain(expected), _plain(actual)
+    try:
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_index_type=False,
+                                          check_column_type=False, check_freq=False, rtol=PARITY_RTOL)
+        elif isinstance(expected, pd.Series):
+            pd.testing.assert_series_equal(expected, actual, check_dtype=False, check_index_type=False,
+                                           check_freq=False, rtol=PARITY_RTOL)
+        elif isinstance(expected, dict):
+            if expected.keys() != actual.keys():
+                return f"keys {sorted(expected)} != {sorted(actual)}"
+            for key in expected:
+                found = _difference(expected[key], actual[key])
+                if found:
+                    return f"{key}: {found}"
+        elif isinstance(expected, (int, float, np.number)):
+            if not np.isclose(expected, actual, rtol=PARITY_RTOL, atol=0, equal_nan=True):
+                return f"{expected!r} != {actual!r}"
+        elif expected != actual:
+            return f"{expected!r} != {actual!r}"
+    except AssertionError as e:
+        return str(e).strip().splitlines()[0]
+    return None
+
+
+def parity_checks():
+    # Every page computation that needs only a filter spec
+    for page in PARITY_PAGES:
+        module = importlib.import_module(f"analytics.{page}")
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            parameters = list(inspect.signature(function).parameters.values())
+            if (function.__module__ == module.__name__ and not name.startswith("_") and parameters
+                    and parameters[0].name == "spec"
+                    and all(p.default is not p.empty for p in parameters[1:])):
+                yield f"{page}.{name}", function
+
+
+def parity_specs():
+    # Whole dataset, a date range in one store, and a category selection
+    import data_loader
+    first, last = data_loader.date_bounds()
+    stores = backend('pandas').members('store_location')
+    categories = backend('pandas').members('product_category')
+    return [
+        {},
+        {'start_date': first + pd.Timedelta(days=30), 'end_date': min(first + pd.Timedelta(days=90), last),
+         'store_location': stores[0]},
+        {'product_category': categories[:2]},
+    ]
+
+
+def parity(candidate='duckdb', reference='pandas', specs=None):
+    # Run every check under both backends, for each spec (parity_specs() by default); returns the differences
+    # found and the seconds each backend took.
+    # The switch is made on the module the analytics import, which is not this one when run as a script.
+    module = importlib.import_module("query")
+    differences = []
+    seconds = {reference: 0.0, candidate: 0.0}
+    specs = parity_specs() if specs is None else specs
+    for name, function in parity_checks():
+        for spec in specs:
+            results = {}
+            for name_of_backend in (reference, candidate):
+                module.BACKEND = name_of_backend
+                try:
+                    start = time.perf_counter()
+                    results[name_of_backend] = function(dict(spec))
+                    seconds[name_of_backend] += time.perf_counter() - start
+                finally:
+                    module.BACKEND = reference
+            found = _difference(results[reference], results[candidate])
+            if found:
+                differences.append(f"{name} {spec}: {found}")
+    return differences, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a query backend gives the same page results as pandas.")
+    parser.add_argument("--backend", default="duckdb", choices=sorted(BACKENDS))
+    args = parser.parse_args()
+
+    differences, seconds = parity(args.backend)
+    print(", ".join(f"{name}: {s:.3f}s" for name, s in seconds.items()))
+    if differences:
+        sys.exit(f"{len(differences)} differences from pandas:\n" + "\n".join(differences))
+    print(f"{args.backend} matches pandas on every checked page computation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import pandas as pd
+
+import data_loader
+from data_loader import load_derived, load_streamed, select_dates, union_categories, update_dates
+from profiling import phase
+
+# Grain of the cube: one row per date, hour, store and product that had sales
+DIMENSIONS = ['transaction_date', 'transaction_hour', 'store_location',
+              'product_category', 'product_type', 'product_detail']
+
+# Additive measures only, so any coarser rollup is a plain sum over cube rows
+MEASURES = ['total_sales', 'transaction_qty', 'cost', 'profit', 'unit_price_sum', 'row_count']
+
+SOURCE_COLUMNS = ['transaction_date', 'transaction_hour', 'transaction_qty', 'unit_price', 'store_location',
+                  'product_category', 'product_type', 'product_detail', 'total_sales', 'cost', 'profit']
+
+# Row-level columns and the cube measure holding their sum
+ROW_MEASURES = {'unit_price': 'unit_price_sum'}
+
+# Keys derived from the date dimension on demand, after the cube has been filtered
+DERIVED_KEYS = {
+    'year_month': lambda cube: cube['transaction_date'].dt.to_period('M'),
+    'month': lambda cube: cube['transaction_date'].dt.month,
+    'day_of_week': lambda cube: cube['transaction_date'].dt.day_name(),
+}
+
+
+def build_cube(data):
+    rows = pd.DataFrame({
+        'transaction_date': data['transaction_date'],
+        'transaction_hour': data['transaction_hour'],
+        'store_location': data['store_location'],
+        'product_category': data['product_category'],
+        'product_type': data['product_type'],
+        'product_detail': data['product_detail'],
+        'total_sales': data['total_sales'],
+        'transaction_qty': data['transaction_qty'],
+        'cost': data['cost'],
+        'profit': data['profit'],
+        'unit_price_sum': data['unit_price'],
+    })
+    cube = rows.groupby(DIMENSIONS, observed=True).agg(
+        total_sales=('total_sales', 'sum'),
+        transaction_qty=('transaction_qty', 'sum'),
+        cost=('cost', 'sum'),
+        profit=('profit', 'sum'),
+        unit_price_sum=('unit_price_sum', 'sum'),
+        row_count=('total_sales', 'size'),
+    ).reset_index()
+    cube['row_count'] = cube['row_count'].astype('int32')
+    return cube
+
+
+def update_cube(cube, appended, data):
+    # Rebuild only the date partitions the appended rows fall into
+    return update_dates(cube, appended, data, build_cube, DIMENSIONS, DIMENSIONS[:2])
+
+
+def merge_cubes(partials):
+    # Cubes of separate chunks as one cube; cells a chunk boundary cut in two are summed back together
+    if len(partials) == 1:
+        return partials[0]
+    cube = pd.concat(union_categories(partials, DIMENSIONS), ignore_index=True).groupby(
+        DIMENSIONS, observed=True)[MEASURES].sum().reset_index()
+    cube['row_count'] = cube['row_count'].astype('int32')
+    return cube
+
+
+def load_cube():
+    if data_loader.OUT_OF_CORE:
+        # Built from the CSV in chunks, one partial cube per chunk, without loading the dataset
+        return load_streamed('sales_cube', build_cube, merge_cubes, SOURCE_COLUMNS)
+    return load_derived('sales_cube', build_cube, SOURCE_COLUMNS, update=update_cube)
+
+
+def members(column, **filters):
+    # Members of a dimension that had sales, in order of first appearance, e.g. for filter options.
+    # Out of core they come from the cube, whose order within an hour can differ from the file's.
+    if data_loader.OUT_OF_CORE:
+        return filter_cube(**filters)[column].drop_duplicates().tolist()
+    return data_loader.load_rows([column], **filters)[column].unique().tolist()
+
+
+def filter_cube(start_date=None, end_date=None, **filters):
+    # Cube rows inside a date range and matching the dimension filters.
+    # A filter value may be a single member or a list of members.
+    return select_dates(load_cube(), start_date, end_date, filters)
+
+
+def load_member_cells(column):
+    # The values of a column present in each cube cell, streamed once per version of the CSV. Out of core,
+    # distinct counts over any selection of cube dimensions are counted from it rather than from a scan.
+    def build(chunk):
+        return chunk[DIMENSIONS + [column]].drop_duplicates()
+
+    def merge(partials):
+        cells = pd.concat(union_categories(partials, DIMENSIONS + [column]), ignore_index=True).drop_duplicates()
+        return cells.sort_values('transaction_date', kind='stable', ignore_index=True)
+
+    return load_streamed(f'member_cells:{column}', build, merge, DIMENSIONS + [column])
+
+
+def count_distinct(column, start_date=None, end_date=None, **filters):
+    # Distinct values of a column in a selection. Transaction ids are as many as the sales rows, so out of core
+    # they are left to the row scan (or, in transactions.transaction_count, to the sketches).
+    if data_loader.OUT_OF_CORE and column != 'transaction_id' and all(c in DIMENSIONS for c in filters):
+        return select_dates(load_member_cells(column), start_date, end_date, filters)[column].nunique()
+    return data_loader.count_distinct(column, start_date, end_date, **filters)
+
+
+def rollup(by, start_date=None, end_date=None, **filters):
+    # Sum the measures of the filtered cube by dimension or derived date keys
+    with phase("rollup"):
+        cube = filter_cube(start_date, end_date, **filters)
+        by = [by] if isinstance(by, str) else list(by)
+        keys = [DERIVED_KEYS[key](cube).rename(key) if key in DERIVED_KEYS else key for key in by]
+        return cube.groupby(keys, observed=True)[MEASURES].sum()
+
+
+def totals(start_date=None, end_date=None, **filters):
+    with phase("rollup"):
+        return filter_cube(start_date, end_date, **filters)[MEASURES].sum()
+
+
+def top_k(by, measure, n=10, ascending=False, start_date=None, end_date=None, **filters):
+    # The n largest (or smallest) members of a key by one measure
+    sums = rollup(by, start_date, end_date, **filters)[measure]
+    return sums.nsmallest(n) if ascending else sums.nlargest(n)
+
+
+def plan_columns(plan):
+    # The cube measures each distinct key of an aggregation plan needs, by key tuple
+    needed = {}
+    for name, (by, measure, how) in plan.items():
+        if how not in ('sum', 'mean', 'count'):
+            raise ValueError(f"Unknown aggregation {how!r} for {name}")
+        column = ROW_MEASURES.get(measure, measure)
+        needed.setdefault((by,) if isinstance(by, str) else tuple(by), set()).update(
+            ['row_count'] if how == 'count' else [column, 'row_count'] if how == 'mean' else [column])
+    return needed
+
+
+def plan_results(plan, grouped):
+    # The named outputs of a plan from the measures summed per key tuple
+    results = {}
+    for name, (by, measure, how) in plan.items():
+        sums = grouped[(by,) if isinstance(by, str) else tuple(by)]
+        column = ROW_MEASURES.get(measure, measure)
+        if how == 'count':
+            results[name] = sums['row_count']
+        elif how == 'mean':
+            results[name] = (sums[column] / sums['row_count']).rename(measure)
+        else:
+            results[name] = sums[column]
+    return results
+
+
+def aggregate(plan, start_date=None, end_date=None, **filters):
+    # Many aggregates of one selection in one pass per key. `plan` maps output names to (by, measure, how),
+    # how being 'sum', 'mean' (per sales row) or 'count' (sales rows). The cube is filtered once, each
+    # derived key computed once, and each distinct key grouped once for all the measures it needs.
+    with phase("aggregate"):
+        cube = filter_cube(start_date, end_date, **filters)
+        needed = plan_columns(plan)
+        keys = {key: DERIVED_KEYS[key](cube).rename(key) for by in needed for key in by if key in DERIVED_KEYS}
+        grouped = {by: cube.groupby([keys.get(key, key) for key in by], observed=True)[sorted(columns)].sum()
+                   for by, columns in needed.items()}
+        return plan_results(plan, grouped)
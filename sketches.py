@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from data_loader import load_derived, load_streamed, select_dates, union_categories, update_dates
+from profiling import phase
+
+# HyperLogLog sketches of the transaction ids, one per date, store and product category. Distinct counts do not
+# add up across cells, but sketches do: the registers of any set of cells merge by taking their maximum, so a
+# transaction count for any date range, stores and categories is estimated without scanning the sales rows.
+DIMENSIONS = ['transaction_date', 'store_location', 'product_category']
+
+SOURCE_COLUMNS = ['transaction_id'] + DIMENSIONS
+
+# 2**PRECISION registers per sketch; more registers, smaller error
+PRECISION = int(os.environ.get("DASHBOARD_HLL_PRECISION", 12))
+
+# Relative standard error of an estimate, 1.6% at precision 12
+RELATIVE_ERROR = 1.04 / np.sqrt(2 ** PRECISION)
+
+# Set DASHBOARD_EXACT_COUNTS=1 to count distinct transactions from the sales rows instead
+EXACT = os.environ.get("DASHBOARD_EXACT_COUNTS") == "1"
+
+
+def _hash(ids):
+    # 64-bit mix of the ids (splitmix64 finalizer), so consecutive ids spread over all registers
+    h = ids.astype(np.uint64)
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _bit_length(values):
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= (np.uint64(1) << np.uint64(shift))
+        length[high] += shift
+        values = np.where(high, values >> np.uint64(shift), values)
+    return length + (values > 0)
+
+
+def registers(ids):
+    # Register of each id (its hash's top PRECISION bits) and its rank (position of the first 1 bit after them)
+    with np.errstate(over='ignore'):
+        hashed = _hash(np.asarray(ids))
+    rest = 64 - PRECISION
+    register = (hashed >> np.uint64(rest)).astype(np.int16 if PRECISION <= 15 else np.int32)
+    rank = (rest + 1 - _bit_length(hashed & np.uint64((1 << rest) - 1))).astype(np.uint8)
+    return register, rank
+
+
+def build_sketches(data):
+    # Sparse sketches: only the registers a cell sets are stored, as rows of cell, register and rank, in date order
+    register, rank = registers(data['transaction_id'].to_numpy())
+    rows = pd.DataFrame({column: data[column] for column in DIMENSIONS})
+    rows['register'] = register
+    rows['rank'] = rank
+    return rows.groupby(DIMENSIONS + ['register'], observed=True)['rank'].max().reset_index()
+
+
+def update_sketches(table, appended, data):
+    # Rebuild only the dates the appended rows fall into
+    return update_dates(table, appended, data, build_sketches, DIMENSIONS[1:], 'transaction_date')
+
+
+def merge_sketches(partials):
+    # A cell split between chunks merges like any other pair of sketches, by the maximum rank per register
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(union_categories(partials, DIMENSIONS[1:]), ignore_index=True).groupby(
+        DIMENSIONS + ['register'], observed=True)['rank'].max().reset_index()
+
+
+def load_sketches():
+    if data_loader.OUT_OF_CORE:
+        return load_streamed('sketches', build_sketches, merge_sketches, SOURCE_COLUMNS)
+    return load_derived('sketches', build_sketches, SOURCE_COLUMNS, update=update_sketches)
+
+
+def covers(filters):
+    # Whether the sketch cells can answer the filters; other filters need the sales rows
+    return all(column in DIMENSIONS for column in filters)
+
+
+def estimate(register, rank, groups=None, n_groups=1):
+    # HyperLogLog estimate of each group's merged registers, with linear counting for small cardinalities
+    m = 2 ** PRECISION
+    groups = np.zeros(len(register), dtype=np.int64) if groups is None else groups
+    merged = np.zeros((n_groups, m), dtype=np.uint8)
+    np.maximum.at(merged, (groups, register), rank)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.ldexp(1.0, -merged.astype(np.int64)).sum(axis=1)
+    zeros = (merged == 0).sum(axis=1)
+    with np.errstate(divide='ignore'):
+        small = m * np.log(m / zeros)
+    return np.where((raw <= 2.5 * m) & (zeros > 0), small, raw)
+
+
+def filter_sketches(start_date=None, end_date=None, **filters):
+    if not covers(filters):
+        raise ValueError(f"Sketches cannot be filtered by {', '.join(c for c in filters if c not in DIMENSIONS)}")
+    return select_dates(load_sketches(), start_date, end_date, filters)
+
+
+def distinct_transactions(start_date=None, end_date=None, by=None, **filters):
+    # Estimated distinct transactions of a selection, or a Series of them per `by` key ('year_month' or a dimension)
+    with phase("sketches"):
+        table = filter_sketches(start_date, end_date, **filters)
+        register, rank = table['register'].to_numpy(), table['rank'].to_numpy()
+        if by is None:
+            return int(round(estimate(register, rank)[0])) if len(table) else 0
+        keys = table['transaction_date'].dt.to_period('M') if by == 'year_month' else table[by]
+        groups, labels = pd.factorize(keys, sort=True)
+        counts = np.rint(estimate(register, rank, groups, len(labels))).astype(np.int64)
+        return pd.Series(counts, index=pd.Index(labels, name=by), name='transactions')
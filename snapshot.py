@@ -0,0 +1,126 @@
+import argparse
+import glob
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import data_loader
+
+# Schema metadata key holding the fingerprint of the CSV a snapshot was built from
+SOURCE_FINGERPRINT_KEY = b"source_fingerprint"
+
+# Bumped whenever data_loader.prepare() changes the stored columns or their layout changes; older snapshots
+# count as stale
+FORMAT_VERSION_KEY = b"format_version"
+FORMAT_VERSION = b"4"
+
+
+def _delta_pattern(csv_path):
+    return os.path.splitext(data_loader.snapshot_path(csv_path))[0] + ".delta-*.arrow"
+
+
+def snapshot_files(csv_path):
+    # The base snapshot followed by the appended batches, oldest first
+    return [data_loader.snapshot_path(csv_path)] + sorted(glob.glob(_delta_pattern(csv_path)))
+
+
+def source_fingerprint(path):
+    # Read only the schema; the column buffers stay on disk
+    metadata = _schema(path).metadata or {}
+    fingerprint = metadata.get(SOURCE_FINGERPRINT_KEY)
+    if not fingerprint or metadata.get(FORMAT_VERSION_KEY) != FORMAT_VERSION:
+        return None
+    return fingerprint.decode()
+
+
+def read_table(paths, columns=None):
+    # Each file is mapped whole and then projected: read_table(columns=...) would copy the selected buffers into
+    # private memory. The files of a chain become chunks of one table, still backed by the mapped pages.
+    tables = [feather.read_table(path, memory_map=True) for path in paths]
+    table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+    return table if columns is None else table.select(columns)
+
+
+def read_columns(paths, columns=None):
+    # Memory-mapped and uncompressed, so only the requested columns are paged in. A single file converts without
+    # copying; the columns of a base plus deltas are joined into private copies, until compact() merges the files.
+    return read_table(paths, columns).to_pandas(split_blocks=True)
+
+
+def _schema(path):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def _write(data, csv_path, path, schema=None):
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    if schema is None:
+        # Wide dictionary indices, so later batches can add members without changing the schema
+        schema = pa.schema([pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+                            if pa.types.is_dictionary(f.type) else f for f in table.schema],
+                           metadata=table.schema.metadata)
+    table = table.select(schema.names).cast(schema)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_FINGERPRINT_KEY] = data_loader.fingerprint(csv_path).encode()
+    metadata[FORMAT_VERSION_KEY] = FORMAT_VERSION
+    table = table.replace_schema_metadata(metadata)
+
+    # Write next to the target and rename, so a running dashboard never maps a half-written file.
+    # One record batch, so each column is one contiguous buffer that pandas wraps without copying:
+    # every process mapping the file then shares the same pages.
+    tmp_path = path + ".tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed", chunksize=max(len(table), 1))
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_snapshot(csv_path, snapshot_path=None):
+    snapshot_path = snapshot_path or data_loader.snapshot_path(csv_path)
+    path = _write(data_loader.read_csv(csv_path), csv_path, snapshot_path)
+
+    # A full rebuild already contains every appended batch
+    for delta in glob.glob(_delta_pattern(csv_path)):
+        os.remove(delta)
+    return path
+
+
+def write_delta(data, csv_path):
+    # Store a batch that was just appended to the CSV, stamped with the CSV's new fingerprint.
+    # It is cast to the base schema so the chain can be concatenated without promotion.
+    existing = snapshot_files(csv_path)
+    delta_path = _delta_pattern(csv_path).replace("*", f"{len(existing):05d}")
+    return _write(data, csv_path, delta_path, schema=_schema(existing[0]))
+
+
+def compact(csv_path):
+    # Fold the appended batches into the base snapshot, rows in date order as the dashboard holds them, so every
+    # process maps one file again. The caller holds data_loader.snapshot_lock.
+    files = snapshot_files(csv_path)
+    if len(files) == 1:
+        return files[0]
+    data = read_columns(files)
+    order = data_loader._date_order(data['transaction_date'])
+    if order is not None:
+        data = data.take(order).reset_index(drop=True)
+    path = _write(data, csv_path, files[0], schema=_schema(files[0]))
+    for delta in files[1:]:
+        os.remove(delta)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the sales CSV into a typed, memory-mappable Arrow snapshot.")
+    parser.add_argument("csv_path", nargs="?", default=data_loader.DATA_PATH)
+    parser.add_argument("--output", help="Snapshot path (defaults to the CSV path with an .arrow suffix)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with data_loader.snapshot_lock(args.csv_path):
+        path = write_snapshot(args.csv_path, args.output)
+    print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
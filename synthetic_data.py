@@ -0,0 +1,176 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+COLUMNS = ['transaction_id', 'transaction_date', 'transaction_time', 'transaction_qty', 'store_id', 'store_location',
+           'product_id', 'unit_price', 'product_category', 'product_type', 'product_detail', 'total_sales',
+           'average_cost']
+
+STORES = ["Lower Manhattan", "Hell's Kitchen", "Astoria"]
+
+# (product_category, product_type, product_detail, unit_price) of the base menu
+MENU = [
+    ("Coffee", "Barista Espresso", "Latte", 4.25),
+    ("Coffee", "Barista Espresso", "Cappuccino", 4.25),
+    ("Coffee", "Barista Espresso", "Espresso shot", 3.00),
+    ("Coffee", "Gourmet brewed coffee", "Columbian Medium Roast", 3.00),
+    ("Coffee", "Gourmet brewed coffee", "Ethiopia", 3.00),
+    ("Coffee", "Organic brewed coffee", "Brazilian", 3.50),
+    ("Coffee", "Premium brewed coffee", "Jamaican Coffee River", 3.75),
+    ("Coffee", "Drip coffee", "Our Old Time Diner Blend", 2.50),
+    ("Tea", "Brewed Chai tea", "Spicy Eye Opener Chai", 3.00),
+    ("Tea", "Brewed Chai tea", "Morning Sunrise Chai", 2.50),
+    ("Tea", "Brewed Black tea", "Earl Grey", 3.00),
+    ("Tea", "Brewed Green tea", "Serenity Green Tea", 3.00),
+    ("Tea", "Brewed herbal tea", "Peppermint", 2.50),
+    ("Drinking Chocolate", "Hot chocolate", "Dark chocolate", 4.75),
+    ("Drinking Chocolate", "Hot chocolate", "Sustainably Grown Organic", 4.75),
+    ("Bakery", "Scone", "Oatmeal Scone", 3.00),
+    ("Bakery", "Scone", "Ginger Scone", 3.50),
+    ("Bakery", "Pastry", "Chocolate Croissant", 3.75),
+    ("Bakery", "Pastry", "Croissant", 3.50),
+    ("Bakery", "Biscotti", "Hazelnut Biscotti", 3.25),
+    ("Flavours", "Regular syrup", "Hazelnut syrup", 0.80),
+    ("Flavours", "Sugar free syrup", "Sugar Free Vanilla syrup", 0.80),
+    ("Coffee beans", "Espresso Beans", "Primo Espresso Roast", 20.45),
+    ("Loose Tea", "Herbal tea", "Lemon Grass", 8.95),
+    ("Branded", "Clothing", "I Need My Bean! T-shirt", 28.00),
+    ("Packaged Chocolate", "Drinking Chocolate", "Dark chocolate", 6.40),
+]
+
+# Share of a day's transactions in each hour; open 6:00 to 21:00 with a morning rush
+HOURLY_PROFILE = np.array([0, 0, 0, 0, 0, 0, 6, 10, 11, 11, 10, 6, 5, 5, 5, 5, 4, 4, 3, 2, 1, 0, 0, 0], dtype=float)
+
+# Monday to Sunday
+WEEKDAY_PROFILE = np.array([1.0, 1.0, 1.0, 1.02, 1.05, 0.9, 0.85])
+
+# Rows are generated and written in date-ordered chunks of about this many rows
+CHUNK_ROWS = 1_000_000
+
+# Average number of items on one ticket
+ITEMS_PER_TICKET = 1.4
+
+
+def build_catalog(products, seed=0):
+    # The base menu, repeated with size variants and jittered prices when more products are asked for
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(products):
+        category, product_type, detail, price = MENU[i % len(MENU)]
+        variant = i // len(MENU)
+        if variant:
+            detail = f"{detail} {['Rg', 'Lg', 'Sm'][variant % 3]}{variant // 3 or ''}"
+            price = round(price * rng.uniform(0.85, 1.3), 2)
+        rows.append((i + 1, category, product_type, detail, price, round(price * rng.uniform(0.3, 0.6), 2)))
+    return pd.DataFrame(rows, columns=['product_id', 'product_category', 'product_type', 'product_detail',
+                                       'unit_price', 'average_cost'])
+
+
+def store_names(stores):
+    return [STORES[i] if i < len(STORES) else f"Store {i + 1}" for i in range(stores)]
+
+
+def daily_weights(dates, growth=0.5):
+    # Weekday pattern times a yearly season (busier in spring and autumn) and steady growth over the period
+    day_of_year = dates.dayofyear.to_numpy()
+    season = 1 + 0.15 * np.sin(4 * np.pi * (day_of_year - 50) / 365.25)
+    trend = 1 + growth * np.linspace(0, 1, len(dates))
+    weights = WEEKDAY_PROFILE[dates.dayofweek.to_numpy()] * season * trend
+    return weights / weights.sum()
+
+
+def generate(rows, stores=3, products=80, start="2023-01-01", days=181, seed=0):
+    # Yield date-ordered chunks of rows with the dataset's schema and time-of-day, weekday and seasonal patterns
+    rng = np.random.default_rng(seed)
+    catalog = build_catalog(products, seed)
+    names = np.array(store_names(stores), dtype=object)
+    dates = pd.date_range(start, periods=days, freq='D')
+    date_text = dates.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    time_text = np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(24 * 3600)], dtype=object)
+
+    # Popularity falls off with product rank; stores get fixed, uneven shares of traffic
+    popularity = 1 / np.arange(1, products + 1) ** 0.8
+    popularity = rng.permutation(popularity / popularity.sum())
+    store_share = rng.uniform(0.7, 1.3, stores)
+    store_share /= store_share.sum()
+    hourly = HOURLY_PROFILE / HOURLY_PROFILE.sum()
+
+    tickets_per_day = rng.multinomial(max(int(rows / ITEMS_PER_TICKET), 1), daily_weights(dates))
+    next_ticket = 1
+    emitted = 0
+    day = 0
+    while day < days and emitted < rows:
+        # Whole days until the chunk is about CHUNK_ROWS rows, so chunks stay in date order
+        end = day + 1
+        while end < days and tickets_per_day[day:end + 1].sum() * ITEMS_PER_TICKET <= CHUNK_ROWS:
+            end += 1
+        n_tickets = int(tickets_per_day[day:end].sum())
+        ticket_day = np.repeat(np.arange(day, end), tickets_per_day[day:end])
+        ticket_seconds = rng.choice(24, n_tickets, p=hourly) * 3600 + rng.integers(0, 3600, n_tickets)
+        ticket_store = rng.choice(stores, n_tickets, p=store_share)
+        order = np.lexsort((ticket_seconds, ticket_day))
+        ticket_day, ticket_seconds, ticket_store = ticket_day[order], ticket_seconds[order], ticket_store[order]
+
+        items = 1 + rng.poisson(ITEMS_PER_TICKET - 1, n_tickets)
+        if end == days and items.sum() < rows - emitted:
+            # Top up the last chunk's tickets with extra items, so exactly `rows` rows come out
+            np.add.at(items, rng.integers(0, n_tickets, rows - emitted - items.sum()), 1)
+        items = items[:np.searchsorted(np.cumsum(items), rows - emitted, 'right') + 1]
+        ticket = np.repeat(np.arange(len(items)), items)[:rows - emitted]
+        product = rng.choice(products, len(ticket), p=popularity)
+        qty = rng.choice([1, 2, 3], len(ticket), p=[0.7, 0.25, 0.05])
+        price = catalog['unit_price'].to_numpy()[product]
+
+        chunk = pd.DataFrame({
+            'transaction_id': next_ticket + ticket,
+            'transaction_date': date_text[ticket_day[ticket]],
+            'transaction_time': time_text[ticket_seconds[ticket]],
+            'transaction_qty': qty,
+            'store_id': ticket_store[ticket] + 1,
+            'store_location': names[ticket_store[ticket]],
+            'product_id': catalog['product_id'].to_numpy()[product],
+            'unit_price': price,
+            'product_category': catalog['product_category'].to_numpy()[product],
+            'product_type': catalog['product_type'].to_numpy()[product],
+            'product_detail': catalog['product_detail'].to_numpy()[product],
+            'total_sales': np.round(price * qty, 2),
+            'average_cost': catalog['average_cost'].to_numpy()[product],
+        }, columns=COLUMNS)
+        next_ticket += len(items)
+        emitted += len(chunk)
+        day = end
+        yield chunk
+
+
+def write_csv(path, rows, **options):
+    # Stream the chunks to disk, so memory stays flat however many rows are asked for
+    written = 0
+    for i, chunk in enumerate(generate(rows, **options)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic coffee shop sales with the dataset's schema.")
+    parser.add_argument("--rows", type=float, default=1e6, help="Rows to generate, e.g. 1e6, 1e7, 1e8")
+    parser.add_argument("--stores", type=int, default=3)
+    parser.add_argument("--products", type=int, default=80)
+    parser.add_argument("--start", default="2023-01-01", help="First transaction date")
+    parser.add_argument("--days", type=int, default=181)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=data_loader.DATA_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = write_csv(args.output, int(args.rows), stores=args.stores, products=args.products, start=args.start,
+                        days=args.days, seed=args.seed)
+    print(f"Wrote {written:,} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS = ['transaction_id', 'transaction_date', 'transaction_time', 'transaction_qty', 'store_id', 'store_location',
+           'product_id', 'unit_price', 'product_category', 'product_type', 'product_detail', 'total_sales',
+           'average_cost']
+
+
+def sales_row(transaction_id, date='2023-01-01', qty=2, price=3.0):
+    return {'transaction_id': transaction_id, 'transaction_date': date, 'transaction_time': '07:30:00',
+            'transaction_qty': qty, 'store_id': 5, 'store_location': 'Astoria', 'product_id': 32,
+            'unit_price': price, 'product_category': 'Coffee', 'product_type': 'Drip coffee',
+            'product_detail': 'Our Old Time Diner Blend Sm', 'total_sales': round(qty * price, 2),
+            'average_cost': 1.5}
+
+
+PRODUCTS = [
+    ('Coffee', 'Drip coffee', 'Our Old Time Diner Blend Sm', 2.0),
+    ('Coffee', 'Barista Espresso', 'Latte Rg', 3.25),
+    ('Tea', 'Brewed Chai tea', 'Spicy Eye Opener Chai Lg', 3.0),
+    ('Tea', 'Brewed herbal tea', 'Peppermint Rg', 2.5),
+    ('Bakery', 'Scone', 'Oatmeal Scone', 3.75),
+]
+STORES = [(3, 'Astoria'), (5, 'Lower Manhattan'), (8, "Hell's Kitchen")]
+
+
+def synthetic_sales(rows=3000, seed=7):
+    # Four months of sales over every store and product, a few rows per transaction, with changing prices
+    rng = np.random.default_rng(seed)
+    transaction = np.arange(rows) // 2 + 1
+    store = rng.integers(len(STORES), size=rows)[transaction - 1]
+    product = rng.integers(len(PRODUCTS), size=rows)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(np.sort(rng.integers(120, size=rows))[transaction - 1],
+                                                          unit='D')
+    seconds = rng.integers(6 * 3600, 20 * 3600, size=rows)[transaction - 1]
+    qty = rng.integers(1, 4, size=rows)
+    price = np.array([p[3] for p in PRODUCTS])[product] + rng.choice([0.0, 0.25, 0.5], size=rows)
+    frame = pd.DataFrame({
+        'transaction_id': transaction,
+        'transaction_date': dates.strftime('%Y-%m-%d'),
+        'transaction_time': pd.to_datetime(seconds, unit='s').strftime('%H:%M:%S'),
+        'transaction_qty': qty,
+        'store_id': [STORES[s][0] for s in store],
+        'store_location': [STORES[s][1] for s in store],
+        'product_id': product + 1,
+        'unit_price': price,
+        'product_category': [PRODUCTS[p][0] for p in product],
+        'product_type': [PRODUCTS[p][1] for p in product],
+        'product_detail': [PRODUCTS[p][2] for p in product],
+        'total_sales': (qty * price).round(2),
+        'average_cost': (np.array([p[3] for p in PRODUCTS])[product] * 0.4).round(2),
+    })
+    return frame[COLUMNS]
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    # A small dataset CSV in its own directory, so each test gets fresh data_loader cache keys
+    path = tmp_path / "sales.csv"
+    pd.DataFrame([sales_row(i, f"2023-01-0{1 + i % 3}") for i in range(1, 7)], columns=COLUMNS).to_csv(
+        path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def batch():
+    # One valid new row, as strings like ingest.py reads it
+    return pd.DataFrame([sales_row(100, '2023-01-04')], columns=COLUMNS).astype(str)
+
+
+@pytest.fixture
+def synthetic_dataset(tmp_path, monkeypatch):
+    # The synthetic sales as the dashboard's data file, in a fresh working directory
+    import data_loader
+    sales = synthetic_sales()
+    sales.to_csv(tmp_path / data_loader.DATA_PATH, index=False)
+    monkeypatch.chdir(tmp_path)
+    return sales
@@ -0,0 +1,13 @@
+import pytest
+
+from analytics.__main__ import call
+
+
+def test_functions_without_a_spec_are_refused_with_usage():
+    with pytest.raises(ValueError, match="does not take a filter spec.*transaction_totals"):
+        call("customer_behavior.segments", {}, {})
+
+
+def test_unknown_options_are_refused_with_usage():
+    with pytest.raises(ValueError, match=r"top_products_by_quantity\(spec, n=5\).*'m'"):
+        call("home.top_products_by_quantity", {}, {"m": 3})
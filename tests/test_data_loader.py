@@ -0,0 +1,78 @@
+import io
+import os
+
+import pandas as pd
+
+import data_loader
+from conftest import COLUMNS, sales_row
+
+
+def test_same_size_edit_in_the_middle_is_detected(tmp_path):
+    # Large enough that the edited row is megabytes away from either end of the file
+    path = str(tmp_path / "sales.csv")
+    rows = pd.DataFrame([sales_row(i, f"2023-01-{1 + i % 28:02d}") for i in range(1, 40001)], columns=COLUMNS)
+    rows.to_csv(path, index=False)
+    assert os.path.getsize(path) > 3 * (1 << 20)
+    before = data_loader.load_data(['total_sales'], path=path)['total_sales'].sum()
+
+    with open(path, "rb") as f:
+        content = f.read()
+    middle = content.index(b"\n", len(content) // 2) + 1
+    line_end = content.index(b"\n", middle)
+    line = content[middle:line_end]
+    edited = line[:line.rindex(b",6.0,")] + b",7.0," + line[line.rindex(b",6.0,") + 5:]
+    assert len(edited) == len(line)
+    with open(path, "r+b") as f:
+        f.seek(middle)
+        f.write(edited)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    after = data_loader.load_data(['total_sales'], path=path)['total_sales'].sum()
+    assert os.path.getsize(path) == len(content)
+    assert round(after - before, 2) == 1.0
+
+
+def test_out_of_core_distinct_counts_come_from_cells(dataset, tmp_path, monkeypatch):
+    import sales_cube
+    os.replace(dataset, tmp_path / data_loader.DATA_PATH)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_loader, "OUT_OF_CORE", False)
+    expected = data_loader.count_distinct('product_id', '2023-01-02', store_location='Astoria')
+    monkeypatch.setattr(data_loader, "OUT_OF_CORE", True)
+    assert sales_cube.count_distinct('product_id', '2023-01-02', store_location='Astoria') == expected
+    assert not data_loader._distinct_counts  # answered without a scan of the CSV
+
+
+def test_appends_hash_only_the_new_bytes(dataset, batch, monkeypatch):
+    import ingest
+    monkeypatch.setattr(data_loader, "_HASH_BLOCK_BYTES", 64)
+    data_loader.fingerprint(dataset)
+    before = os.path.getsize(dataset)
+    ingest.append_batch(batch, dataset)
+
+    read = []
+
+    class CountingFile(io.FileIO):
+        def read(self, size=-1):
+            block = super().read(size)
+            read.append(len(block))
+            return block
+
+    monkeypatch.setattr(data_loader, "open", lambda path, mode: CountingFile(path, mode.replace("b", "")),
+                        raising=False)
+    appended = data_loader.fingerprint(dataset)
+    assert sum(read) <= (os.path.getsize(dataset) - before) + 2 * 64
+    monkeypatch.setattr(data_loader, "_hash_states", {})
+    assert appended == data_loader._digest(dataset, os.path.getsize(dataset))
+
+
+def test_csv_loads_parse_only_the_requested_columns(dataset, batch):
+    import ingest
+    data_loader.load_data(['total_sales'], path=dataset)
+    assert set(data_loader._cache["columns"]) == {'transaction_date', 'total_sales'}
+    ingest.append_batch(batch, dataset)
+    projected = data_loader.load_data(['transaction_date', 'total_sales', 'profit', 'store_location'], path=dataset)
+    data_loader._cache["files"] = None  # force a full reload to compare against
+    full = data_loader.load_data(path=dataset)
+    pd.testing.assert_frame_equal(projected, full[projected.columns])
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import elasticity
+
+# Product, base price and true elasticity of the synthetic demand curves
+PRODUCTS = [('Coffee', 'Latte Rg', 3.25, -1.6), ('Tea', 'Peppermint Rg', 2.5, -0.4)]
+
+
+def demand(seed=5, days=120):
+    # Daily units at prices varied around each product's base price, from log(units) = a + elasticity * log(price)
+    rng = np.random.default_rng(seed)
+    frames = []
+    for category, product, base_price, slope in PRODUCTS:
+        price = base_price * rng.uniform(0.7, 1.3, size=days).round(2)
+        units = 40 * (price / base_price) ** slope * rng.lognormal(0, 0.05, size=days)
+        frames.append(pd.DataFrame({
+            'product_category': category, 'product_detail': product,
+            'transaction_date': pd.date_range('2023-01-01', periods=days), 'unit_price': price,
+            'transaction_qty': units,
+        }))
+    # A product that never changed price has no elasticity to fit
+    frames.append(pd.DataFrame({
+        'product_category': 'Bakery', 'product_detail': 'Oatmeal Scone',
+        'transaction_date': pd.date_range('2023-01-01', periods=days), 'unit_price': 3.75, 'transaction_qty': 12.0,
+    }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_fit_recovers_known_elasticities():
+    table = elasticity.fit_elasticities(demand()).set_index('product_detail')
+    for _, product, _, slope in PRODUCTS:
+        fit = table.loc[product]
+        assert abs(fit['elasticity'] - slope) < 0.05
+        assert fit['ci_low'] < slope < fit['ci_high']
+        assert fit['observations'] == 120
+    assert np.isnan(table.loc['Oatmeal Scone', 'elasticity'])
+    assert table.loc['Oatmeal Scone', 'price_points'] == 1
@@ -0,0 +1,59 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import forecast_cache
+
+
+def daily_series(seed):
+    values = np.random.default_rng(seed).normal(100, 10, 60).cumsum()
+    return pd.Series(values, index=pd.date_range('2023-01-01', periods=60, freq='D'))
+
+
+def test_concurrent_requests_for_a_key_fit_it_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "CACHE_DIR", str(tmp_path))
+    before = forecast_cache.cache_stats()
+    series = daily_series(1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(forecast_cache.arima_forecast(series, (1, 1, 0))))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = forecast_cache.cache_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 3
+    assert all(result.equals(results[0]) for result in results)
+
+
+def test_other_keys_are_served_while_one_is_fitted(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "CACHE_DIR", str(tmp_path))
+    ready = forecast_cache.arima_forecast(daily_series(2), (1, 1, 0))
+    # Dropped from memory, so serving it means reading it back from disk
+    monkeypatch.setattr(forecast_cache, "_memory", {})
+    slow_key = forecast_cache.series_key(daily_series(3), (1, 1, 0), 30)
+    started, release = threading.Event(), threading.Event()
+    read = forecast_cache._read
+
+    def blocking_read(key):
+        if key == slow_key:
+            started.set()
+            release.wait(10)
+        return read(key)
+
+    monkeypatch.setattr(forecast_cache, "_read", blocking_read)
+    slow = threading.Thread(target=forecast_cache.arima_forecast, args=(daily_series(3), (1, 1, 0)))
+    slow.start()
+    try:
+        assert started.wait(10)
+        served = []
+        other = threading.Thread(
+            target=lambda: served.append(forecast_cache.arima_forecast(daily_series(2), (1, 1, 0))))
+        other.start()
+        other.join(5)
+        assert served and served[0].equals(ready)
+    finally:
+        release.set()
+        slow.join()
@@ -0,0 +1,71 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import data_loader
+import ingest
+from conftest import COLUMNS
+
+
+def test_valid_batch_is_appended(dataset, batch):
+    typed = ingest.append_batch(batch, dataset)
+    assert len(typed) == 1
+    assert len(data_loader.load_data(path=dataset)) == 7
+
+
+@pytest.mark.parametrize("column, value", [
+    ('transaction_id', 'abc'),
+    ('transaction_id', '1.5'),
+    ('store_id', 'x'),
+    ('store_id', '-3'),
+    ('product_id', 'p32'),
+    ('transaction_qty', '0'),
+    ('transaction_qty', 'two'),
+    ('unit_price', '-3.0'),
+    ('total_sales', 'lots'),
+    ('average_cost', 'n/a'),
+    ('average_cost', '-1.5'),
+    ('average_cost', ''),
+])
+def test_invalid_numeric_values_are_rejected(dataset, batch, column, value):
+    batch[column] = value
+    with pytest.raises(ValueError, match=column):
+        ingest.append_batch(batch, dataset)
+    assert len(pd.read_csv(dataset)) == 6
+
+
+@pytest.mark.parametrize("value", ['NA', 'null', 'nan', ''])
+def test_values_parsed_as_missing_are_rejected(dataset, batch, value):
+    batch['store_location'] = value
+    with pytest.raises(ValueError, match="store_location"):
+        ingest.append_batch(batch, dataset)
+
+
+def test_missing_column_is_rejected(dataset, batch):
+    with pytest.raises(ValueError, match="average_cost"):
+        ingest.validate_batch(batch.drop(columns='average_cost'), COLUMNS)
+
+
+def test_shared_rebuild_waits_for_delta(dataset, batch, monkeypatch):
+    # A DASHBOARD_SHARED worker that finds the snapshot stale between ingest's CSV append and its delta write
+    # must wait for the delta, not rebuild the base from the appended CSV (which would hold the batch twice)
+    snapshot = pytest.importorskip("snapshot")
+    snapshot.write_snapshot(dataset)
+    write_delta = snapshot.write_delta
+    rebuild = threading.Thread(target=data_loader._share_snapshot, args=(dataset,))
+
+    def interleaved_write_delta(data, csv_path):
+        rebuild.start()
+        rebuild.join(timeout=0.5)
+        assert rebuild.is_alive(), "the rebuild ran while ingest held the snapshot lock"
+        return write_delta(data, csv_path)
+
+    monkeypatch.setattr(snapshot, "write_delta", interleaved_write_delta)
+    ingest.append_batch(batch, dataset)
+    rebuild.join()
+
+    # The waiting worker then folded the delta into the base, once
+    assert len(snapshot.snapshot_files(dataset)) == 1
+    assert len(snapshot.read_columns(snapshot.snapshot_files(dataset))) == 7
+    assert len(data_loader.load_data(path=dataset)) == len(pd.read_csv(dataset)) == 7
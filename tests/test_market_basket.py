@@ -0,0 +1,37 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import market_basket
+
+
+def brute_force_itemsets(baskets, min_count, max_size):
+    # Every itemset of every basket, counted one by one
+    counts = {}
+    for basket in baskets:
+        for size in range(1, max_size + 1):
+            for itemset in combinations(sorted(basket), size):
+                counts[itemset] = counts.get(itemset, 0) + 1
+    return {itemset: count for itemset, count in counts.items() if count >= min_count}
+
+
+def test_frequent_itemsets_match_a_brute_force_count():
+    rng = np.random.default_rng(3)
+    # Popular items are bought more often, so itemsets of every size pass the support threshold
+    weights = np.linspace(3, 0.5, 12)
+    baskets = [set(rng.choice(12, size=rng.integers(1, 6), replace=False, p=weights / weights.sum()))
+               for _ in range(400)]
+    rows = [t for t, basket in enumerate(baskets) for _ in basket]
+    items = [i for basket in baskets for i in basket]
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, items)), shape=(len(baskets), 12))
+    labels = pd.Index([f"item {i:02d}" for i in range(12)])
+
+    itemsets = market_basket.frequent_itemsets(matrix, labels, min_support=0.02, max_size=4)
+    found = {tuple(sorted(itemset)): count for itemset, count in zip(itemsets['itemset'], itemsets['transactions'])}
+    expected = brute_force_itemsets(baskets, min_count=8, max_size=4)
+
+    assert found == {tuple(labels[i] for i in itemset): count for itemset, count in expected.items()}
+    assert itemsets['size'].max() == 4
+    assert np.allclose(itemsets['support'], itemsets['transactions'] / len(baskets))
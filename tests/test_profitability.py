@@ -0,0 +1,15 @@
+import os
+
+import data_loader
+import ingest
+from analytics.profitability_analysis import cost_table
+
+
+def test_cost_table_shows_recorded_costs_after_an_ingest(dataset, batch, tmp_path, monkeypatch):
+    os.replace(dataset, tmp_path / data_loader.DATA_PATH)
+    monkeypatch.chdir(tmp_path)
+    assert cost_table({'product_category': 'Coffee'})['average_cost'].tolist() == [1.5]
+    batch['average_cost'] = '1.234'
+    ingest.append_batch(batch, data_loader.DATA_PATH)
+    # Both costs as recorded, not rounded or averaged into one
+    assert cost_table({'product_category': 'Coffee'})['average_cost'].tolist() == [1.234, 1.5]
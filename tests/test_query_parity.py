@@ -0,0 +1,26 @@
+import pytest
+
+import data_loader
+import query
+from conftest import synthetic_sales
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(params=["csv", "snapshot"])
+def sales_data(request, tmp_path, monkeypatch):
+    # The dashboard's data path in its own directory, served from the CSV or from an Arrow snapshot
+    synthetic_sales().to_csv(tmp_path / data_loader.DATA_PATH, index=False)
+    monkeypatch.chdir(tmp_path)
+    if request.param == "snapshot":
+        snapshot = pytest.importorskip("snapshot")
+        snapshot.write_snapshot(data_loader.DATA_PATH)
+    assert data_loader._resolve_source(data_loader.DATA_PATH)[0] == request.param
+    return request.param
+
+
+@pytest.mark.parametrize("spec_index", range(3))
+def test_duckdb_matches_pandas(sales_data, spec_index):
+    spec = query.parity_specs()[spec_index]
+    differences, _ = query.parity('duckdb', specs=[spec])
+    assert differences == []
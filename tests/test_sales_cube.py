@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+import data_loader
+import sales_cube
+
+PLAN = {
+    'sales_by_store': ('store_location', 'total_sales', 'sum'),
+    'units_by_month_and_category': (['year_month', 'product_category'], 'transaction_qty', 'sum'),
+    'price_by_product': ('product_detail', 'unit_price', 'mean'),
+    'rows_by_weekday': ('day_of_week', 'total_sales', 'count'),
+    'profit_by_hour': ('transaction_hour', 'profit', 'sum'),
+}
+
+ROW_KEYS = {
+    'year_month': lambda rows: rows['transaction_date'].dt.to_period('M'),
+    'day_of_week': lambda rows: rows['transaction_date'].dt.day_name(),
+}
+
+
+def raw_groupby(rows, by, measure, how):
+    by = [by] if isinstance(by, str) else by
+    keys = [ROW_KEYS[key](rows).rename(key) if key in ROW_KEYS else rows[key] for key in by]
+    grouped = rows.groupby(keys, observed=True)[measure]
+    return grouped.size() if how == 'count' else grouped.agg(how)
+
+
+@pytest.mark.parametrize("spec", [
+    {},
+    {'start_date': '2023-02-10', 'end_date': '2023-03-20', 'store_location': ['Astoria', "Hell's Kitchen"]},
+])
+def test_aggregate_matches_a_groupby_of_the_sales_rows(synthetic_dataset, spec):
+    results = sales_cube.aggregate(PLAN, **spec)
+    rows = data_loader.load_rows(['transaction_date', 'transaction_hour', 'store_location', 'product_category',
+                                  'product_detail', 'total_sales', 'transaction_qty', 'unit_price', 'profit'], **spec)
+    assert set(results) == set(PLAN)
+    for name, (by, measure, how) in PLAN.items():
+        pd.testing.assert_series_equal(results[name], raw_groupby(rows, by, measure, how),
+                                       check_names=False, check_dtype=False, check_index_type=False)
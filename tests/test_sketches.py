@@ -0,0 +1,27 @@
+import numpy as np
+
+import data_loader
+import sketches
+
+
+def test_estimates_are_within_the_relative_error():
+    rng = np.random.default_rng(11)
+    errors = []
+    for cardinality in [20000, 50000, 100000] * 10:
+        ids = rng.choice(10 ** 9, size=cardinality, replace=False)
+        register, rank = sketches.registers(ids)
+        errors.append(sketches.estimate(register, rank)[0] / cardinality - 1)
+    errors = np.abs(errors)
+    # RELATIVE_ERROR is one standard error: about two thirds of the estimates fall within it, nearly all within three
+    assert np.median(errors) < sketches.RELATIVE_ERROR
+    assert errors.max() < 3 * sketches.RELATIVE_ERROR
+
+
+def test_merged_sketches_count_distinct_transactions(synthetic_dataset):
+    spec = {'start_date': '2023-01-15', 'end_date': '2023-04-15', 'store_location': 'Astoria'}
+    rows = data_loader.load_rows(['transaction_id', 'transaction_date'], **spec)
+    exact = rows.groupby(rows['transaction_date'].dt.to_period('M'))['transaction_id'].nunique()
+    estimated = sketches.distinct_transactions(by='year_month', **spec)
+    assert (estimated.index == exact.index).all()
+    assert np.all(np.abs(estimated / exact - 1) < 3 * sketches.RELATIVE_ERROR)
+    assert abs(sketches.distinct_transactions(**spec) / exact.sum() - 1) < 3 * sketches.RELATIVE_ERROR
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import data_loader
+import ingest
+
+snapshot = pytest.importorskip("snapshot")
+
+
+def mapped_file(series):
+    # The file the memory behind a column is mapped from, or None for private memory (heap or anonymous)
+    address = series.to_numpy().ctypes.data
+    with open("/proc/self/maps") as maps:
+        for line in maps:
+            fields = line.split()
+            start, end = (int(bound, 16) for bound in fields[0].split("-"))
+            if start <= address < end:
+                return fields[5] if len(fields) > 5 and fields[5].startswith("/") else None
+    return None
+
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="needs /proc/self/maps")
+
+
+def test_projected_columns_stay_mapped(dataset):
+    snapshot.write_snapshot(dataset)
+    data = data_loader.load_data(['total_sales', 'transaction_qty'], path=dataset)
+    assert mapped_file(data['total_sales']) == data_loader.snapshot_path(dataset)
+    assert mapped_file(data['transaction_qty']) == data_loader.snapshot_path(dataset)
+
+
+def test_shared_load_after_an_ingest_maps_one_compacted_file(dataset, batch, monkeypatch):
+    snapshot.write_snapshot(dataset)
+    ingest.append_batch(batch, dataset)
+    assert len(snapshot.snapshot_files(dataset)) == 2
+    monkeypatch.setattr(data_loader, "SHARED", True)
+    data = data_loader.load_data(['transaction_date', 'total_sales'], path=dataset)
+    assert snapshot.snapshot_files(dataset) == [data_loader.snapshot_path(dataset)]
+    assert len(data) == 7 and data['transaction_date'].is_monotonic_increasing
+    assert mapped_file(data['total_sales']) == data_loader.snapshot_path(dataset)
+
+
+def test_compaction_maps_cached_columns_again_and_keeps_derived_results(dataset, batch):
+    snapshot.write_snapshot(dataset)
+    data_loader.load_data(['total_sales'], path=dataset)
+    ingest.append_batch(batch, dataset)
+    before = data_loader.load_data(['total_sales'], path=dataset)
+    assert mapped_file(before['total_sales']) is None  # base and delta joined into a private copy
+    result = data_loader.load_derived('total', lambda data: [data['total_sales'].sum()], ['total_sales'],
+                                      path=dataset, update=lambda table, appended, data: table)
+    with data_loader.snapshot_lock(dataset):
+        snapshot.compact(dataset)
+    after = data_loader.load_data(['total_sales'], path=dataset)
+    assert after['total_sales'].tolist() == before['total_sales'].tolist()
+    assert mapped_file(after['total_sales']) == data_loader.snapshot_path(dataset)
+    assert data_loader.load_derived('total', None, ['total_sales'], path=dataset) is result
@@ -0,0 +1,90 @@
+import pandas as pd
+
+import data_loader
+import sketches
+from data_loader import count_distinct, load_derived, load_streamed, select_dates, union_categories, update_dates
+from profiling import phase
+
+# Attributes a transaction has as a whole. A transaction_id is one ticket, rung up at one store at one time,
+# so filters on these columns select whole transactions; filters on product columns need the sales rows.
+DIMENSIONS = ['transaction_date', 'transaction_hour', 'time_slot', 'store_location']
+
+MEASURES = ['items', 'transaction_qty', 'total_sales']
+
+SOURCE_COLUMNS = ['transaction_id', 'transaction_date', 'transaction_hour', 'time_slot', 'store_location',
+                  'transaction_qty', 'total_sales']
+
+
+def build_transactions(data):
+    # One row per transaction_id, in date order: when, where, how many lines, units and sales
+    table = data[SOURCE_COLUMNS].groupby('transaction_id', sort=False).agg(
+        transaction_date=('transaction_date', 'first'),
+        transaction_hour=('transaction_hour', 'first'),
+        time_slot=('time_slot', 'first'),
+        store_location=('store_location', 'first'),
+        items=('transaction_qty', 'size'),
+        transaction_qty=('transaction_qty', 'sum'),
+        total_sales=('total_sales', 'sum'),
+    ).reset_index()
+    table['items'] = table['items'].astype('int32')
+    return table.sort_values('transaction_date', kind='stable', ignore_index=True)
+
+
+def update_transactions(table, appended, data):
+    # Rebuild only the dates the appended rows fall into
+    return update_dates(table, appended, data, build_transactions, ['store_location'], 'transaction_date')
+
+
+def load_transactions():
+    return load_derived('transactions', build_transactions, SOURCE_COLUMNS, update=update_transactions)
+
+
+def build_transaction_counts(data):
+    # Transactions, lines, units and sales per date, hour, slot and store. These add up across chunks,
+    # which makes this the out-of-core stand-in for the transaction table when only counts are needed.
+    table = build_transactions(data)
+    grouped = table.groupby(DIMENSIONS, observed=True)
+    return grouped[MEASURES].sum().assign(transactions=grouped.size()).reset_index()
+
+
+def merge_transaction_counts(partials):
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(union_categories(partials, ['store_location']), ignore_index=True).groupby(
+        DIMENSIONS, observed=True)[MEASURES + ['transactions']].sum().reset_index()
+
+
+def load_transaction_counts():
+    return load_streamed('transaction_counts', build_transaction_counts, merge_transaction_counts, SOURCE_COLUMNS)
+
+
+def covers(filters):
+    # Whether the filters select whole transactions, so the transaction table can answer them
+    return all(column in DIMENSIONS for column in filters)
+
+
+def filter_transactions(start_date=None, end_date=None, counts=False, **filters):
+    # Transactions inside a date range and matching filters on the transaction dimensions,
+    # or with `counts` their per date, hour, slot and store counts
+    if not covers(filters):
+        raise ValueError(f"Transactions cannot be filtered by {', '.join(c for c in filters if c not in DIMENSIONS)}")
+    with phase("transactions"):
+        table = load_transaction_counts() if counts else load_transactions()
+        return select_dates(table, start_date, end_date, filters)
+
+
+def estimated(start_date=None, end_date=None, **filters):
+    # Whether transaction_count estimates the selection from the distinct-count sketches
+    return not covers(filters) and not sketches.EXACT and sketches.covers(filters)
+
+
+def transaction_count(start_date=None, end_date=None, **filters):
+    # Distinct transactions of a selection. Filters on product categories are answered by merging sketches,
+    # within sketches.RELATIVE_ERROR, other product filters by counting the sales rows.
+    if covers(filters) and data_loader.OUT_OF_CORE:
+        return int(filter_transactions(start_date, end_date, counts=True, **filters)['transactions'].sum())
+    if covers(filters):
+        return len(filter_transactions(start_date, end_date, **filters))
+    if estimated(**filters):
+        return sketches.distinct_transactions(start_date, end_date, **filters)
+    return count_distinct('transaction_id', start_date, end_date, **filters)